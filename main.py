@@ -3,6 +3,10 @@ import pygame_gui
 
 from src.scenes.screen_manager import ScreenManager
 from src.audio.audio_manager import AudioManager
+from src.data import storage
+from src.ai import capture_worker, classification_cache, preloader
+from src.ai.sentiment import TRAIT_ANALYZED
+from src.ui.tweeter_card import handle_trait_analysis
 
 # CONFIGURATION
 WINDOW_WIDTH = 1200
@@ -60,6 +64,9 @@ except Exception as e:
 
 pygame.display.update()
 
+# Start loading the AI models in the background while the rest starts up
+preloader.start()
+
 # 3. Heavy Imports (Now that window is visible)
 # This import chain triggers torch/transformers loading
 
@@ -97,6 +104,9 @@ while running:
             
             manager.set_window_resolution((clamped_w, clamped_h))
             screen_manager.resize((clamped_w, clamped_h))
+
+        elif event.type == TRAIT_ANALYZED:
+            handle_trait_analysis(event)
             
         manager.process_events(event)
         screen_manager.process_event(event)
@@ -113,4 +123,7 @@ while running:
     pygame.display.update()
 
 screen_manager.cleanup()
+capture_worker.shutdown()  # Let a photo still being identified finish saving
+classification_cache.flush()  # Save cache entries and recency not written yet
+storage.flush()  # Write out any queued bird changes before exiting
 pygame.quit()
\ No newline at end of file
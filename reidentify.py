@@ -0,0 +1,191 @@
+"""
+Re-identifies every bird in the archive with the current models and label
+policy, updating species and sprite family in place.
+
+Run from the project root (no display needed):
+
+    python reidentify.py
+    python reidentify.py --workers 4 --batch-size 32 --status archived
+
+Birds are streamed from storage in batches and classified across a pool of
+worker processes. Birds with a saved crop are re-classified from it; birds
+without one get detection re-run on the full photo first. Finished bird ids
+are appended to a progress file, so an interrupted run picks up where it
+left off; pass --restart to start over.
+"""
+import os
+
+# Headless: pygame is only used for pixel conversion here
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import concurrent.futures
+import multiprocessing
+import sys
+import time
+
+PROGRESS_FILE = os.path.join('assets', 'reidentify.progress')
+
+
+def _init_worker(threads):
+    import torch
+
+    # Share the CPU between the workers instead of each grabbing every core
+    torch.set_num_threads(threads)
+
+
+def _identify_batch(jobs):
+    """
+    Runs in a worker process. jobs is a list of (bird_id, image_path, cropped_path).
+    Returns (bird_id, species, sprite family, new crop array or None) per
+    readable bird. Birds without a readable image are skipped; a detector or
+    classifier failure raises, so the batch is retried instead of stored.
+    """
+    import numpy as np
+    from PIL import Image
+
+    from src.ai import image_processor
+
+    ids, images, new_crops = [], [], []
+    for bird_id, image_path, cropped_path in jobs:
+        has_crop = bool(cropped_path) and os.path.exists(cropped_path)
+        if not has_crop and not (image_path and os.path.exists(image_path)):
+            print(f"Skipping bird {bird_id}: no image on disk")
+            continue
+        try:
+            with Image.open(cropped_path if has_crop else image_path) as image:
+                picture = image.convert('RGB')
+        except (OSError, ValueError) as e:
+            print(f"Skipping bird {bird_id}: {e}")
+            continue
+
+        crop = None
+        if not has_crop:
+            # Outside the read error handling: a detector failure must fail the batch
+            frame = np.asarray(picture)
+            crops = image_processor.detect_birds(frame, raise_errors=True)
+            if crops:
+                crop = np.ascontiguousarray(crops[0])
+                picture = Image.fromarray(crop)
+        ids.append(bird_id)
+        images.append(picture)
+        new_crops.append(crop)
+
+    # The archive is a one-off pass: don't churn the shared classification cache
+    identified = image_processor.identify_birds(images, use_cache=False, raise_errors=True)
+    return [(bird_id, species, family, crop)
+            for bird_id, (species, family), crop in zip(ids, identified, new_crops)]
+
+
+def read_progress(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r') as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def batches(storage, status, batch_size, done):
+    """Yields lists of (bird_id, image_path, cropped_path) for birds not yet done."""
+    batch = []
+    for bird in storage.iter_birds(status, order_by='timestamp'):
+        if bird['id'] in done:
+            continue
+        batch.append((bird['id'], bird.get('image_path'), bird.get('cropped_path')))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def show_progress(done, total, changed, started):
+    rate = done / max(time.monotonic() - started, 1e-6)
+    width = 30
+    filled = int(width * done / total) if total else width
+    sys.stdout.write(f"\r[{'#' * filled}{'.' * (width - filled)}] {done}/{total} birds"
+                     f"  {changed} changed  {rate:.1f}/s")
+    sys.stdout.flush()
+
+
+def run(workers, batch_size, status, restart):
+    from src.data import capture_store, storage
+
+    if restart and os.path.exists(PROGRESS_FILE):
+        os.remove(PROGRESS_FILE)
+    done = read_progress(PROGRESS_FILE)
+    total = storage.count_birds(status)
+    old_species = {}
+    changed = 0
+    processed = len(done)
+    if done:
+        print(f"Resuming: {processed} of {total} birds already done")
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    context = multiprocessing.get_context('spawn')
+    started = time.monotonic()
+    with open(PROGRESS_FILE, 'a') as progress, concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(threads,)) as pool:
+        pending = {}  # Future -> ids of the birds in its batch
+        jobs = batches(storage, status, batch_size, done)
+        exhausted = False
+        while pending or not exhausted:
+            # Keep a couple of batches queued per worker without reading the whole archive
+            while not exhausted and len(pending) < workers * 2:
+                batch = next(jobs, None)
+                if batch is None:
+                    exhausted = True
+                    break
+                for bird_id, _image_path, _cropped_path in batch:
+                    old_species[bird_id] = storage.get_bird(bird_id)['species']
+                pending[pool.submit(_identify_batch, batch)] = [job[0] for job in batch]
+            if not pending:
+                break
+
+            finished, _running = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                batch_ids = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    print(f"\nBatch failed, will be retried on the next run: {e}")
+                    continue
+
+                for bird_id, species, family, crop in results:
+                    updates = {'species': species, 'sprite_family': family}
+                    if crop is not None:
+                        updates['cropped_path'] = capture_store.store_array(crop)
+                    storage.update_bird_data(bird_id, updates)
+                    if species != old_species.get(bird_id):
+                        changed += 1
+
+                # Record the batch only once its updates are on disk
+                storage.flush()
+                for bird_id in batch_ids:
+                    old_species.pop(bird_id, None)
+                    progress.write(bird_id + '\n')
+                progress.flush()
+                processed += len(batch_ids)
+                show_progress(processed, total, changed, started)
+
+    capture_store.flush()
+    storage.close_repository()
+    print(f"\nDone: {changed} of {total} birds changed species")
+    if len(read_progress(PROGRESS_FILE)) >= total:
+        os.remove(PROGRESS_FILE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run bird detection and classification over the whole archive.")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="worker processes (each loads its own models)")
+    parser.add_argument('--batch-size', type=int, default=16, help="birds per classifier batch")
+    parser.add_argument('--status', choices=['field', 'archived'], default=None,
+                        help="only birds with this status (default: all)")
+    parser.add_argument('--restart', action='store_true', help="ignore progress from an interrupted run")
+    args = parser.parse_args()
+
+    run(max(1, args.workers), max(1, args.batch_size), args.status, args.restart)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Runs the capture pipeline (store, detect, crop, classify, save) off the
+pygame main thread so the camera preview keeps running while a photo is
+processed.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from src.ai.image_processor import process_image
+
+# Posted when a capture finishes: event.birds lists the saved birds (empty on
+# failure) and event.job is the Future returned by submit_capture
+CAPTURE_PROCESSED = pygame.event.custom_type()
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # One worker: captures are processed in the order they were taken and
+        # the models never run on two threads at once
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='capture-worker')
+    return _executor
+
+
+def submit_capture(surface):
+    """
+    Queues a camera frame for processing and returns a Future for the list
+    of saved birds. A CAPTURE_PROCESSED event is posted when it is done.
+    """
+    # The camera may reuse its buffer for the next frame
+    job = get_executor().submit(process_image, surface.copy())
+    job.add_done_callback(_post_result)
+    return job
+
+
+def _post_result(job):
+    birds = [] if job.cancelled() or job.exception() else job.result()
+    try:
+        pygame.event.post(pygame.event.Event(CAPTURE_PROCESSED, birds=birds, job=job))
+    except pygame.error:
+        # Display already shut down
+        pass
+
+
+def shutdown():
+    """Waits for captures in flight so their birds are saved before exit."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
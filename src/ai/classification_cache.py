@@ -0,0 +1,143 @@
+"""
+Persistent cache of species-classifier results keyed by a perceptual hash.
+
+Photos of the same feeder bird rarely match byte for byte, but their
+difference hashes (dHash) land within a few bits of each other. A crop whose
+hash is within HAMMING_THRESHOLD of a cached one reuses that entry's full
+ranked result list instead of running the classifier again.
+
+Changes (new entries and recency updates alike) are saved in batches: at
+most once per SAVE_DELAY on a background timer, and on flush() at shutdown.
+Entries are written least recently used first, so the LRU order survives a
+restart.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from src.data.journal import atomic_write_json
+
+CACHE_FILE = os.path.join('assets', 'classification_cache.json')
+# Most entries kept; the least recently used are dropped beyond this
+MAX_ENTRIES = 2000
+# Differing bits (out of 64) still treated as the same image
+HAMMING_THRESHOLD = 6
+# Seconds changes may wait before the file is rewritten
+SAVE_DELAY = 30
+
+_cache = None
+
+
+def dhash(image):
+    """64-bit difference hash of a PIL Image."""
+    small = image.convert('L').resize((9, 8))
+    pixels = small.tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class ClassificationCache:
+    """LRU map of image hash -> classifier results, saved to a JSON file."""
+
+    def __init__(self, path, model, max_entries=MAX_ENTRIES, threshold=HAMMING_THRESHOLD):
+        self.path = path
+        self.model = model
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # one file write at a time
+        self._entries = OrderedDict()  # hash -> results, least recently used first
+        self._dirty = False
+        self._timer = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Ignoring unreadable classification cache: {e}")
+            return
+        # Results from another model don't apply
+        if data.get('model') != self.model:
+            return
+        for key, results in data.get('entries', []):
+            self._entries[int(key, 16)] = results
+
+    def _changed(self):
+        """Marks the cache dirty and schedules a save (call with _lock held)."""
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(SAVE_DELAY, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Writes the cache now if anything changed since the last save."""
+        with self._save_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                entries = [[f"{key:016x}", results] for key, results in self._entries.items()]
+                self._dirty = False
+            try:
+                atomic_write_json(self.path, {'model': self.model, 'entries': entries})
+            except OSError as e:
+                print(f"Error saving classification cache: {e}")
+                with self._lock:
+                    self._changed()
+
+    def get(self, image_hash):
+        """Returns the results cached for the nearest hash within threshold, or None."""
+        with self._lock:
+            best_key, best_distance = None, self.threshold + 1
+            for key in self._entries:
+                distance = hamming(key, image_hash)
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+                    if distance == 0:
+                        break
+            if best_key is None:
+                return None
+            if next(reversed(self._entries)) != best_key:
+                self._entries.move_to_end(best_key)
+                self._changed()
+            return [dict(result) for result in self._entries[best_key]]
+
+    def put(self, image_hash, results):
+        with self._lock:
+            self._entries[image_hash] = [{'label': r['label'], 'score': float(r['score'])} for r in results]
+            self._entries.move_to_end(image_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._changed()
+
+
+def flush():
+    """Saves the shared cache's pending changes (call at shutdown)."""
+    if _cache is not None:
+        _cache.flush()
+
+
+def get_classification_cache(model):
+    global _cache
+    if _cache is None or _cache.model != model:
+        if _cache is not None:
+            _cache.flush()
+        _cache = ClassificationCache(CACHE_FILE, model)
+    return _cache
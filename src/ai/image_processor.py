@@ -1,163 +1,238 @@
-import pygame
-import os
 import datetime
+import threading
+import numpy as np
+import pygame
+import torch
 from transformers import pipeline
 from PIL import Image
 from ultralytics import YOLO
+from src.ai import model_registry, onnx_backend
+from src.ai.classification_cache import dhash, get_classification_cache
+from src.ai.label_policy import DEFAULT_SPRITE_FAMILY, UNKNOWN_LABEL, LabelPolicy
+from src.data import capture_store
 from src.data.storage import save_bird
 
-CAPTURES_DIR = os.path.join('assets', 'captures')
-CLASSIFIER = None
-DETECTOR = None
+# CONFIGURATION
+# 'torch' runs the models as downloaded; 'onnx' runs int8-quantized ONNX exports
+# through ONNX Runtime (exported once into assets/models, torch if that fails)
+INFERENCE_BACKEND = 'torch'
+CLASSIFIER_MODEL = "chriamue/bird-species-classifier"
+DETECTOR_WEIGHTS = "yolo11n.pt"
 
-def get_classifier():
-    global CLASSIFIER
-    if CLASSIFIER is None:
+LABEL_POLICY = None
+
+# Detection settings
+BIRD_CLASS = 14  # COCO class 14 is 'bird'
+DETECTION_CONFIDENCE = 0.35
+NMS_IOU = 0.5  # Overlapping boxes above this IoU are merged into one bird
+MAX_BIRDS_PER_CAPTURE = 8
+# The capture worker and the live camera overlay share one YOLO model
+_detect_lock = threading.Lock()
+
+def _load_classifier():
+    classifier = None
+    if INFERENCE_BACKEND == 'onnx':
+        print("Loading ONNX bird classification model...")
+        classifier = onnx_backend.load_classifier(CLASSIFIER_MODEL)
+    if classifier is None:
         print("Loading local bird classification model... this may take a moment.")
         # Device -1 means CPU. Users with CUDA could use device=0, but let's stick to CPU for safety/compat.
-        CLASSIFIER = pipeline("image-classification", model="chriamue/bird-species-classifier")
-    return CLASSIFIER
+        classifier = pipeline("image-classification", model=CLASSIFIER_MODEL)
+    return classifier
 
-def get_detector():
-    global DETECTOR
-    if DETECTOR is None:
+def _load_detector():
+    detector = None
+    if INFERENCE_BACKEND == 'onnx':
+        print("Loading ONNX YOLO object detector...")
+        detector = onnx_backend.load_detector(DETECTOR_WEIGHTS)
+    if detector is None:
         print("Loading YOLO object detector...")
-        DETECTOR = YOLO("yolo11n.pt")
-    return DETECTOR
+        detector = YOLO(DETECTOR_WEIGHTS)
+    return detector
+
+model_registry.register('classifier', _load_classifier)
+model_registry.register('detector', _load_detector)
 
-def identify_bird(image_path):
+def get_classifier():
+    # Loaded on demand and unloaded when idle or over budget by the registry
+    return model_registry.get('classifier')
+
+def get_detector():
+    return model_registry.get('detector')
+
+def surface_to_array(surface):
     """
-    Identifies bird species using local transformers model.
-    Returns the top label description or 'Unknown Bird'.
+    Returns the Surface's pixels as an HxWx3 RGB array. This is a view, not a
+    copy, and keeps the surface locked while it is alive.
     """
+    return pygame.surfarray.pixels3d(surface).swapaxes(0, 1)
+
+def get_label_policy():
+    """The label rules compiled against the classifier's labels."""
+    global LABEL_POLICY
+    if LABEL_POLICY is None:
+        LABEL_POLICY = LabelPolicy(get_classifier().model.config.id2label)
+    return LABEL_POLICY
+
+def classify(images):
+    """Class probabilities for PIL images, an (images x labels) array, from one batched forward pass."""
+    classifier = get_classifier()
+    inputs = classifier.image_processor(images=images, return_tensors='pt')
+    with torch.no_grad():
+        logits = classifier.model(**inputs).logits
+    logits = logits.detach().cpu().numpy().astype(np.float64)
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+def identify_birds(images, use_cache=True, raise_errors=False):
+    """
+    Identifies the species of several bird images (file paths or PIL Images).
+    Near-duplicates of earlier images are answered from the classification
+    cache (unless use_cache is False); the rest go through the classifier in
+    one batched call.
+    Returns one (species, sprite family) pair per image. If the classifier
+    fails, every unanswered image gets UNKNOWN_LABEL, or the error is raised
+    with raise_errors (for callers that must not store a failure as a result).
+    """
+    if not images:
+        return []
+    images = [Image.open(image).convert('RGB') if isinstance(image, str) else image for image in images]
+    unknown = (UNKNOWN_LABEL, DEFAULT_SPRITE_FAMILY)
     try:
-        classifier = get_classifier()
-        # Transformers pipeline accepts file path directly
-        results = classifier(image_path)
-        
-        # Returns list like [{'label': 'species', 'score': 0.9}, ...]
-        # Returns list like [{'label': 'species', 'score': 0.9}, ...]
-        if results and len(results) > 0:
-            print(f"--- Classification Results for {os.path.basename(image_path)} ---")
-            for r in results:
-                print(f"  {r['label']}: {r['score']:.4f}")
-            print("--------------------------------------------------")
-
-            # Immediate check: If Top Result contains "loony", abort immediately.
-            top_label_lower = results[0]['label'].lower()
-            # print(f"Checking Top Result '{results[0]['label']}' for restriction 'loony'...")
-            
-            if "looney" in top_label_lower:
-                print(f"Top classifier result is restricted ('{results[0]['label']}'). Returning 'Unknown Bird'.")
-                return "Unknown Bird"
-
-            # User wants to prioritize specific keywords: "dove", "owl", "sparrow", "pigeon"
-            priority_keywords = ["dove", "owl", "sparrow", "pigeon"]
-            
-            best_priority_result = None
-            
-            for result in results:
-                label_lower = result['label'].lower()
-                for keyword in priority_keywords:
-                    if keyword in label_lower:
-                        if best_priority_result is None:
-                            best_priority_result = result
-                        break
-                if best_priority_result:
-                    break
-            
-            final_label = None
-            if best_priority_result:
-                print(f"Priority Keyword Match: '{best_priority_result['label']}' (Score: {best_priority_result['score']:.4f})")
-                print(f"  (Selected over Top Result: '{results[0]['label']}' with score {results[0]['score']:.4f})")
-                final_label = best_priority_result['label']
-            else:
-                print(f"No priority keyword found. Using Top Result: '{results[0]['label']}'")
-                final_label = results[0]['label']
-
-            # Double check final label (mostly redundant now for Loony Bird if it's not in priority list, but safe)
-            if "looney" in final_label.lower():
-                 print(f"Blocked restricted classification: '{final_label}'. Returning 'Unknown Bird'.")
-                 return "Unknown Bird"
-            
-            return final_label
-            
+        policy = get_label_policy()
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"Identification failed: {e}")
-        
-    return 'Unknown Bird'
+        return [unknown] * len(images)
+
+    cache = get_classification_cache(CLASSIFIER_MODEL) if use_cache else None
+    hashes = [dhash(image) for image in images] if use_cache else [None] * len(images)
+    choices = [None] * len(images)
+    misses = []
+    for i, image_hash in enumerate(hashes):
+        results = cache.get(image_hash) if cache else None
+        if results is None:
+            misses.append(i)
+        else:
+            choices[i] = policy.choose(policy.ids_for([r['label'] for r in results]))[0]
+    if len(misses) < len(images):
+        print(f"Classification cache hit for {len(images) - len(misses)} of {len(images)} image(s)")
+
+    if misses:
+        try:
+            probabilities = classify([images[i] for i in misses])
+            ranked = policy.rank(probabilities)
+            for row, (i, (species, family)) in enumerate(zip(misses, policy.choose(ranked))):
+                choices[i] = (species, family)
+                if cache:
+                    cache.put(hashes[i], [{'label': policy.labels[j], 'score': float(probabilities[row, j])}
+                                          for j in ranked[row]])
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Identification failed: {e}")
+            for i in misses:
+                choices[i] = unknown
+
+    for species, family in choices:
+        print(f"Identified: {species} (sprite: {family})")
+    return choices
 
-def detect_and_crop(image_path):
+def identify_bird(image):
     """
-    Detects a bird in the image and returns the path to the cropped image.
-    Returns None if no bird is detected or detection fails.
+    Identifies bird species using local transformers model.
+    image is a file path or a PIL Image.
+    Returns the top label description or 'Unknown Bird'.
+    """
+    return identify_birds([image])[0][0]
+
+def run_detector(frame, **kwargs):
+    """Runs YOLO on an HxWx3 RGB array, one caller at a time. Returns its results."""
+    detector = get_detector()
+    with _detect_lock:
+        # YOLO takes arrays in BGR order; reversing the channels is just a view
+        return detector(frame[..., ::-1], classes=[BIRD_CLASS], verbose=False, **kwargs)
+
+def detect_birds(frame, raise_errors=False):
+    """
+    Detects every bird in an HxWx3 RGB array and returns the crops around
+    them (views into frame), most confident first. Returns an empty list if
+    no bird is detected or detection fails (or raises, with raise_errors).
     """
     try:
-        detector = get_detector()
-        # Run inference, suppress verbose output
-        results = detector(image_path, verbose=False)
+        # Boxes below the confidence threshold are dropped and overlapping ones
+        # merged (non-max suppression) inside the detector
+        results = run_detector(frame, conf=DETECTION_CONFIDENCE, iou=NMS_IOU, max_det=MAX_BIRDS_PER_CAPTURE)
         
-        # COCO class 14 is 'bird'
+        detections = []
         for result in results:
             for box in result.boxes:
-                cls = int(box.cls[0])
-                if cls == 14: # bird
-                    xyxy = box.xyxy[0].tolist()
-                    
-                    with Image.open(image_path) as img:
-                        crop = img.crop((xyxy[0], xyxy[1], xyxy[2], xyxy[3]))
-                        
-                        crops_dir = os.path.join(CAPTURES_DIR, 'crops')
-                        if not os.path.exists(crops_dir):
-                            os.makedirs(crops_dir)
-                            
-                        filename = os.path.basename(image_path)
-                        crop_path = os.path.join(crops_dir, filename)
-                        crop.save(crop_path)
-                        print(f"Bird detected and cropped to: {crop_path}")
-                        return crop_path
-                        
-        print("No bird detected in image.")
-        return None
+                if int(box.cls[0]) != BIRD_CLASS:
+                    continue
+                x1, y1, x2, y2 = [int(round(v)) for v in box.xyxy[0].tolist()]
+                crop = frame[max(y1, 0):y2, max(x1, 0):x2]
+                if crop.size == 0:
+                    continue
+                detections.append((float(box.conf[0]), crop))
+                print(f"Bird detected at ({x1}, {y1}, {x2}, {y2}), confidence {float(box.conf[0]):.2f}")
+
+        if not detections:
+            print("No bird detected in image.")
+        detections.sort(key=lambda d: d[0], reverse=True)
+        return [crop for _conf, crop in detections]
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"Detection failed: {e}")
-        return None
+        return []
 
 def process_image(surface):
     """
-    Saves the provided surface to disk and records it in storage.
-    Returns True on success, False otherwise.
+    Identifies every bird in the provided surface and records one bird per
+    detection in storage (or one for the whole photo if none is found).
+    Detection, cropping and classification all run on the in-memory pixels,
+    with all crops classified in a single batch; images are written to the
+    capture store in the background.
+    Returns the list of saved birds' data, empty on failure.
     """
-    if not os.path.exists(CAPTURES_DIR):
-        os.makedirs(CAPTURES_DIR)
-
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"bird_{timestamp}.png"
-    filepath = os.path.join(CAPTURES_DIR, filename)
-
+    birds = []
+    unsaved = []  # Image references taken for birds not saved yet
     try:
-        pygame.image.save(surface, filepath)
-        
-        # Detect and crop
-        crop_path = detect_and_crop(filepath)
-        inference_path = crop_path if crop_path else filepath
+        # One contiguous copy of the pixels, shared by hashing, detection and cropping
+        frame = np.ascontiguousarray(surface_to_array(surface))
+        crops = [np.ascontiguousarray(crop) for crop in detect_birds(frame)]
         
-        # Identify bird species
-        species = identify_bird(inference_path)
-
-        # Save metadata
-        bird_data = {
-            'image_path': filepath,
-            'timestamp': datetime.datetime.now().isoformat(),
-            'species': species,
-            'cropped_path': crop_path # Optional: store this too?
-        }
-        if save_bird(bird_data):
-            print(f"Processed and saved: {filepath} (Species: {species})")
-            return bird_data
-        else:
-            return None
+        # Identify every bird's species in one pass
+        identified = identify_birds([Image.fromarray(crop) for crop in crops] or [Image.fromarray(frame)])
+        timestamp = datetime.datetime.now().isoformat()
+
+        filepath = None
+        for crop, (species, family) in zip(crops or [None], identified):
+            # Every bird holds its own reference to the shared photo
+            filepath = capture_store.store_array(frame) if filepath is None else capture_store.retain(filepath)
+            unsaved.append(filepath)
+            crop_path = capture_store.store_array(crop) if crop is not None else None
+            unsaved.append(crop_path)
+
+            # Save metadata
+            bird_data = {
+                'image_path': filepath,
+                'timestamp': timestamp,
+                'species': species,
+                'sprite_family': family,
+                'cropped_path': crop_path # Optional: store this too?
+            }
+            if save_bird(bird_data):
+                print(f"Processed and saved: {filepath} (Species: {species})")
+                birds.append(bird_data)
+                # Only this bird's references are owned now; an earlier failed one's still need releasing
+                del unsaved[-2:]
 
     except Exception as e:
         print(f"Failed to process image: {e}")
-        return None
+
+    # Nothing points at these stored images now
+    for path in unsaved:
+        capture_store.release(path)
+    return birds
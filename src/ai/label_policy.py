@@ -0,0 +1,84 @@
+"""
+Which classifier label a capture ends up with, and which sprite it gets.
+
+The keyword rules below are compiled once against the classifier's id2label
+table into per-label masks, so choosing the final label for a batch of
+images is a handful of array lookups on label ids instead of substring scans
+over label strings on every call.
+"""
+import numpy as np
+
+UNKNOWN_LABEL = "Unknown Bird"
+# Labels containing any of these are never shown
+BLOCKED_KEYWORDS = ["looney"]
+# Among the top results, a label containing one of these wins over the top one
+PRIORITY_KEYWORDS = ["dove", "owl", "sparrow", "pigeon"]
+# How many ranked results the priority keywords are searched in
+TOP_K = 5
+
+# Sprite family -> species keywords; anything else uses the default family
+SPRITE_FAMILIES = {
+    "pigeon": ["pigeon", "dove"],
+    "sparrow": ["sparrow"],
+}
+DEFAULT_SPRITE_FAMILY = "owl"
+
+
+def _matches(label, keywords):
+    label = label.lower()
+    return any(keyword in label for keyword in keywords)
+
+
+def sprite_family(species):
+    """Sprite family for a species name (used when no compiled index applies)."""
+    for family, keywords in SPRITE_FAMILIES.items():
+        if _matches(species or "", keywords):
+            return family
+    return DEFAULT_SPRITE_FAMILY
+
+
+class LabelPolicy:
+    """The label rules compiled against one classifier's id2label table."""
+
+    def __init__(self, id2label):
+        size = max(int(i) for i in id2label) + 1
+        self.labels = [UNKNOWN_LABEL] * size
+        for i, label in id2label.items():
+            self.labels[int(i)] = label
+        self.label2id = {label: i for i, label in enumerate(self.labels)}
+
+        self.blocked = np.array([_matches(label, BLOCKED_KEYWORDS) for label in self.labels])
+        self.priority = np.array([_matches(label, PRIORITY_KEYWORDS) for label in self.labels])
+        self.families = [sprite_family(label) for label in self.labels]
+
+    def rank(self, scores):
+        """Label ids of the TOP_K best scores for each row of an (images x labels) array."""
+        scores = np.asarray(scores)
+        k = min(TOP_K, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        return np.take_along_axis(top, order, axis=1)
+
+    def ids_for(self, labels):
+        """Label ids for ranked label strings (e.g. cached results), skipping unknown ones."""
+        return np.array([self.label2id[label] for label in labels if label in self.label2id], dtype=int)
+
+    def choose(self, ranked):
+        """
+        Final (label, sprite family) for each row of ranked label ids: the
+        first priority label among them, else the top one; blocked labels
+        become UNKNOWN_LABEL.
+        """
+        ranked = np.asarray(ranked, dtype=int)
+        if ranked.ndim == 1:
+            ranked = ranked[None, :]
+        if ranked.shape[1] == 0:
+            return [(UNKNOWN_LABEL, DEFAULT_SPRITE_FAMILY)] * len(ranked)
+
+        rows = np.arange(len(ranked))
+        is_priority = self.priority[ranked]
+        chosen = np.where(is_priority.any(axis=1), ranked[rows, is_priority.argmax(axis=1)], ranked[:, 0])
+        blocked = self.blocked[ranked[:, 0]] | self.blocked[chosen]
+
+        return [(UNKNOWN_LABEL, DEFAULT_SPRITE_FAMILY) if is_blocked else (self.labels[i], self.families[i])
+                for i, is_blocked in zip(chosen.tolist(), blocked.tolist())]
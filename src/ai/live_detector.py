@@ -0,0 +1,119 @@
+"""
+Live bird detection on the camera preview.
+
+Every Nth preview frame is shrunk and handed to a background thread running
+the YOLO detector; the latest boxes are kept for the camera screen to draw.
+N follows the detector's own measured inference time, so the detector is
+busy for at most about DETECTOR_SHARE of the time at TARGET_FPS and leaves
+the rest of the CPU to the UI.
+"""
+import math
+import threading
+import time
+
+import numpy as np
+import pygame
+
+from src.ai.image_processor import DETECTION_CONFIDENCE, run_detector
+
+# Longest side of the frames sent to the detector
+LIVE_INPUT_SIZE = 320
+TARGET_FPS = 60
+MIN_FRAME_SKIP = 2
+MAX_FRAME_SKIP = 30
+# Fraction of wall time the detector thread may spend on inference
+DETECTOR_SHARE = 0.5
+# Weight of the newest measurement in the smoothed inference time
+LATENCY_SMOOTHING = 0.2
+# Boxes older than this are treated as stale
+RESULT_TTL = 1.0
+
+
+class LiveDetector:
+    def __init__(self):
+        self.frame_skip = MIN_FRAME_SKIP
+        self.inference_time = None  # smoothed seconds per detection
+        self.boxes = []  # (x1, y1, x2, y2, confidence), as fractions of the frame
+        self.available = True  # False once the detector has failed
+        self._frame_count = 0
+        self._result_time = 0.0
+        self._pending = None
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='live-detector', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._pending = None
+            self._cond.notify()
+        self.boxes = []
+
+    def submit(self, surface):
+        """Offers a preview frame; only every frame_skip-th one is detected."""
+        self._frame_count += 1
+        if not self.available or self._frame_count % self.frame_skip:
+            return
+        with self._cond:
+            if self._pending is not None:
+                # Detector still busy with the last one; don't queue a backlog
+                return
+            width, height = surface.get_size()
+            scale = min(1.0, LIVE_INPUT_SIZE / max(width, height))
+            small = pygame.transform.scale(surface, (max(1, int(width * scale)), max(1, int(height * scale))))
+            self._pending = small
+            self._cond.notify()
+
+    def _record_latency(self, seconds):
+        """Sets the frame skip from the detector's smoothed inference time."""
+        if self.inference_time is None:
+            self.inference_time = seconds
+        else:
+            self.inference_time += LATENCY_SMOOTHING * (seconds - self.inference_time)
+        frames = math.ceil(self.inference_time * TARGET_FPS / DETECTOR_SHARE)
+        self.frame_skip = max(MIN_FRAME_SKIP, min(MAX_FRAME_SKIP, frames))
+
+    def bird_in_frame(self):
+        return bool(self.boxes) and time.monotonic() - self._result_time < RESULT_TTL
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and self._running:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                surface = self._pending
+
+            try:
+                self._detect(surface)
+            except Exception as e:
+                print(f"Live detection disabled: {e}")
+                self.available = False
+                self.boxes = []
+            finally:
+                with self._cond:
+                    self._pending = None
+
+    def _detect(self, surface):
+        frame = np.ascontiguousarray(pygame.surfarray.array3d(surface).swapaxes(0, 1))
+        height, width = frame.shape[:2]
+        started = time.monotonic()
+        results = run_detector(frame, conf=DETECTION_CONFIDENCE, imgsz=LIVE_INPUT_SIZE)
+        self._record_latency(time.monotonic() - started)
+
+        boxes = []
+        for result in results:
+            for box in result.boxes:
+                x1, y1, x2, y2 = box.xyxy[0].tolist()
+                boxes.append((x1 / width, y1 / height, x2 / width, y2 / height, float(box.conf[0])))
+        if self._running:
+            self.boxes = boxes
+            self._result_time = time.monotonic()
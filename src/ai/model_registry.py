@@ -0,0 +1,154 @@
+"""
+One place that owns the loaded AI models.
+
+Modules register a loader per model name and fetch the model with get(name)
+each time they need it. The registry loads on first use, keeps track of how
+much memory each model takes, and unloads models that haven't been used for
+IDLE_EVICT_SECONDS or, when the total goes over MEMORY_BUDGET_MB, the least
+recently used ones. An unloaded model is loaded again on its next get(), so
+callers never see the difference beyond the reload time.
+"""
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# CONFIGURATION
+# Total size of the loaded models before the least recently used are unloaded (None: no limit)
+MEMORY_BUDGET_MB = 2048
+# Models unused for this long are unloaded (None: never)
+IDLE_EVICT_SECONDS = 600
+REAPER_INTERVAL = 30
+
+_loaders = {}  # name -> function() returning the model
+_name_locks = {}  # name -> Lock held while that model loads
+_lock = threading.Lock()
+_models = OrderedDict()  # name -> model, least recently used first
+_sizes = {}  # name -> bytes
+_last_used = {}  # name -> monotonic time
+_reaper = None
+
+
+def register(name, loader):
+    """Declares how to load a model. Registering again replaces the loader."""
+    with _lock:
+        _loaders[name] = loader
+        _name_locks.setdefault(name, threading.Lock())
+
+
+def _tensor_bytes(module):
+    total = 0
+    for tensor in list(module.parameters()) + list(module.buffers()):
+        total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def estimate_size(model, depth=0):
+    """Bytes held by a model: its torch weights, or the file behind an ONNX session."""
+    if hasattr(model, 'parameters') and hasattr(model, 'buffers'):
+        size = _tensor_bytes(model)
+        # A wrapper around a non-torch backend has no weights of its own
+        if size:
+            return size
+    for attr in ('model_path', 'ckpt_path'):
+        path = getattr(model, attr, None)
+        if isinstance(path, (str, os.PathLike)) and os.path.isfile(path):
+            return os.path.getsize(path)
+    inner = getattr(model, 'model', None)
+    if inner is not None and depth < 3:
+        return estimate_size(inner, depth + 1)
+    if isinstance(model, (str, os.PathLike)) and os.path.isfile(model):
+        return os.path.getsize(model)
+    return 0
+
+
+def get(name):
+    """Returns the named model, loading it (and making room for it) if needed."""
+    with _lock:
+        if name in _models:
+            _models.move_to_end(name)
+            _last_used[name] = time.monotonic()
+            return _models[name]
+        loader = _loaders[name]
+        name_lock = _name_locks[name]
+
+    with name_lock:
+        with _lock:
+            if name in _models:
+                _last_used[name] = time.monotonic()
+                return _models[name]
+
+        model = loader()
+        size = estimate_size(model)
+        with _lock:
+            _models[name] = model
+            _sizes[name] = size
+            _last_used[name] = time.monotonic()
+            print(f"Model loaded: {name} ({size / 2**20:.0f} MB)")
+            _enforce_budget(keep=name)
+        _start_reaper()
+        return model
+
+
+def _enforce_budget(keep):
+    if MEMORY_BUDGET_MB is None:
+        return
+    budget = MEMORY_BUDGET_MB * 2**20
+    for name in list(_models):
+        if sum(_sizes.values()) <= budget:
+            break
+        if name != keep:
+            _unload(name, "over memory budget")
+
+
+def _unload(name, reason):
+    del _models[name]
+    _sizes.pop(name, None)
+    _last_used.pop(name, None)
+    print(f"Model unloaded: {name} ({reason})")
+    # Callers still using it keep their own reference; memory is freed after
+    gc.collect()
+
+
+def evict(name):
+    with _lock:
+        if name in _models:
+            _unload(name, "evicted")
+
+
+def evict_idle(now=None):
+    """Unloads every model unused for IDLE_EVICT_SECONDS. Returns their names."""
+    if IDLE_EVICT_SECONDS is None:
+        return []
+    now = time.monotonic() if now is None else now
+    with _lock:
+        idle = [name for name in _models if now - _last_used[name] > IDLE_EVICT_SECONDS]
+        for name in idle:
+            _unload(name, "idle")
+    return idle
+
+
+def is_loaded(name):
+    with _lock:
+        return name in _models
+
+
+def loaded_bytes():
+    with _lock:
+        return sum(_sizes.values())
+
+
+def _start_reaper():
+    global _reaper
+    with _lock:
+        if _reaper is not None:
+            return
+        _reaper = threading.Thread(target=_reap, name='model-reaper', daemon=True)
+        _reaper.start()
+
+
+def _reap():
+    while True:
+        time.sleep(REAPER_INTERVAL)
+        evict_idle()
@@ -0,0 +1,89 @@
+"""
+Optional ONNX Runtime backend for the capture models.
+
+The first time it is used, each model is exported to ONNX, its weights are
+quantized to int8, and the result is cached under assets/models. Later runs
+load the cached file directly. On CPU this is noticeably faster per call and
+much smaller in memory than the PyTorch models.
+
+Needs onnx, onnxruntime and optimum[onnxruntime]. Every loader returns None
+when something is missing or the export fails, and the caller then falls
+back to the PyTorch model.
+"""
+import os
+import shutil
+
+import numpy as np
+
+MODEL_CACHE_DIR = os.path.join('assets', 'models')
+
+
+def _quantize_onnx(onnx_path, quantized_path):
+    import onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QUInt8)
+
+    # Keep the metadata ultralytics reads back (class names, input size, task)
+    original = onnx.load(onnx_path)
+    quantized = onnx.load(quantized_path)
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(original.metadata_props)
+    onnx.save(quantized, quantized_path)
+
+
+def load_detector(weights):
+    """Returns a YOLO model running an int8 ONNX export of weights, or None."""
+    try:
+        from ultralytics import YOLO
+
+        stem = os.path.splitext(os.path.basename(weights))[0]
+        quantized_path = os.path.join(MODEL_CACHE_DIR, f"{stem}.int8.onnx")
+        if not os.path.exists(quantized_path):
+            print(f"Exporting {weights} to ONNX (first run only)...")
+            if not os.path.exists(MODEL_CACHE_DIR):
+                os.makedirs(MODEL_CACHE_DIR)
+            exported_path = YOLO(weights).export(format='onnx')
+            tmp_path = quantized_path + '.tmp'
+            _quantize_onnx(exported_path, tmp_path)
+            os.replace(tmp_path, quantized_path)
+
+        detector = YOLO(quantized_path, task='detect')
+        # Fail now rather than mid-capture if the runtime can't run the graph
+        detector(np.zeros((64, 64, 3), dtype=np.uint8), verbose=False)
+        return detector
+    except Exception as e:
+        print(f"ONNX detector unavailable, using PyTorch: {e}")
+        return None
+
+
+def load_classifier(model_id):
+    """Returns an image-classification pipeline running an int8 ONNX export of model_id, or None."""
+    try:
+        from optimum.onnxruntime import ORTModelForImageClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoImageProcessor, pipeline
+
+        cache_dir = os.path.join(MODEL_CACHE_DIR, model_id.replace('/', '--') + '-int8')
+        if not os.path.exists(cache_dir):
+            print(f"Exporting {model_id} to ONNX (first run only)...")
+            export_dir = cache_dir + '.export'
+            tmp_dir = cache_dir + '.tmp'
+            model = ORTModelForImageClassification.from_pretrained(model_id, export=True)
+            model.save_pretrained(export_dir)
+
+            # Dynamic quantization: int8 weights, activations quantized per call
+            quantizer = ORTQuantizer.from_pretrained(export_dir)
+            quantizer.quantize(save_dir=tmp_dir,
+                               quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False))
+            model.config.save_pretrained(tmp_dir)
+            AutoImageProcessor.from_pretrained(model_id).save_pretrained(tmp_dir)
+            os.replace(tmp_dir, cache_dir)
+            shutil.rmtree(export_dir, ignore_errors=True)
+
+        model = ORTModelForImageClassification.from_pretrained(cache_dir, file_name='model_quantized.onnx')
+        return pipeline("image-classification", model=model,
+                        image_processor=AutoImageProcessor.from_pretrained(cache_dir))
+    except Exception as e:
+        print(f"ONNX classifier unavailable, using PyTorch: {e}")
+        return None
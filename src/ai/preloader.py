@@ -0,0 +1,90 @@
+"""
+Loads the AI models in the background while the splash screen is up, so the
+first capture or chat doesn't stall on a multi-second model load.
+
+Each model gets its own thread that loads it through the usual get_* function
+and runs one throwaway inference to warm it up. The UI asks is_ready(name) to
+show whether a model can be used yet; code that needs the model can
+wait_ready(name) (or just call the get_* function, which blocks until the
+same load finishes).
+"""
+import threading
+
+from src.ai import model_registry
+
+_lock = threading.Lock()
+_threads = {}
+_done = {}  # name -> Event, set once loading has finished (or failed)
+_failed = set()
+_registry_names = {}  # name -> model_registry name, when a warm-up loaded a differently named model
+
+
+def _warm_classifier():
+    from PIL import Image
+    from src.ai.image_processor import get_classifier
+
+    get_classifier()(Image.new('RGB', (224, 224)))
+
+
+def _warm_detector():
+    import numpy as np
+    from src.ai.image_processor import get_detector
+
+    get_detector()(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+
+
+def _warm_sentiment():
+    from src.ai.sentiment import analyze_texts, engine_model_name
+
+    # Warm-up only: not a lexicon/model answer worth counting in the tier stats
+    analyze_texts([("Hello there", ['Calm', 'Brave'])], fast_path=False, record_stats=False)
+    return engine_model_name()
+
+
+MODELS = {
+    'classifier': _warm_classifier,
+    'detector': _warm_detector,
+    'sentiment': _warm_sentiment,
+}
+
+
+def _load(name):
+    try:
+        _registry_names[name] = MODELS[name]() or name
+        print(f"Model ready: {name}")
+    except Exception as e:
+        print(f"Failed to preload {name} model: {e}")
+        _failed.add(name)
+    finally:
+        _done[name].set()
+
+
+def start(names=None):
+    """Starts loading the given models (all of them by default). Safe to call again."""
+    with _lock:
+        for name in names or MODELS:
+            if name in _threads:
+                continue
+            _done[name] = threading.Event()
+            thread = threading.Thread(target=_load, args=(name,), name=f'preload-{name}', daemon=True)
+            _threads[name] = thread
+            thread.start()
+
+
+def is_ready(name):
+    """True once the model has loaded and warmed up (and not been unloaded since)."""
+    return (name in _done and _done[name].is_set() and name not in _failed
+            and model_registry.is_loaded(_registry_names.get(name, name)))
+
+
+def is_loading(name):
+    """True while the preloader is still working on the model."""
+    return name in _done and not _done[name].is_set()
+
+
+def wait_ready(name, timeout=None):
+    """Blocks until the model has finished loading. Returns is_ready(name)."""
+    if name not in _done:
+        start([name])
+    _done[name].wait(timeout)
+    return is_ready(name)
@@ -1,24 +1,304 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pygame
 import torch
 from transformers import pipeline
 
-_sentiment_pipeline = None
+from src.ai import model_registry, trait_lexicon
 
-def get_pipeline():
-    global _sentiment_pipeline
-    if _sentiment_pipeline is None:
-        print("Loading sentiment analysis model...")
-        # Use simple default model (distilbert-base-uncased-finetuned-sst-2-english)
-        # Device logic: check for cuda
-        device = 0 if torch.cuda.is_available() else -1
+DEFAULT_LABELS = ['Intelligent', 'Curious', 'Brave', 'Lazy', 'Friendly']
+# Same hypothesis the zero-shot pipeline uses
+HYPOTHESIS_TEMPLATE = "This example is {}."
+# (text, label) pairs per forward pass
+MAX_PAIRS_PER_PASS = 32
+
+# 'nli': zero-shot entailment, one hypothesis per label per text (most accurate)
+# 'embedding': one encoder pass per text, compared against cached label embeddings (much faster)
+TRAIT_ENGINE = 'nli'
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+LABEL_EMBEDDINGS_FILE = os.path.join('assets', 'models', 'trait_label_embeddings.npz')
+# Softmax temperature over cosine similarities; lower is more decisive
+EMBEDDING_TEMPERATURE = 0.05
+
+# Answer short, unambiguous lines with trait_lexicon before touching a model
+LEXICON_FAST_PATH = True
+# Share of lexicon answers also scored by the model, to measure how often they agree
+# (near misses are always compared, since they go to the model anyway)
+SHADOW_SAMPLE_RATE = 0.05
+SHADOW_SAMPLES = 1000
+
+# Posted when a queued analysis finishes: event.scores plus the submit() payload
+TRAIT_ANALYZED = pygame.event.custom_type()
+
+_analysis_service = None
+
+_stats_lock = threading.Lock()
+_tier_stats = {tier: {'texts': 0, 'answered': 0, 'seconds': 0.0} for tier in ('lexicon', 'model')}
+_shadow = deque(maxlen=SHADOW_SAMPLES)  # (lexicon confidence, model agreed on the dominant trait)
+
+def _load_pipeline():
+    print("Loading sentiment analysis model...")
+    # Use simple default model (distilbert-base-uncased-finetuned-sst-2-english)
+    # Device logic: check for cuda
+    device = 0 if torch.cuda.is_available() else -1
+    try:
+        # Zero-Shot Classification for custom traits
+        # Using distilbart-mnli-12-1 for speed/efficiency
+        return pipeline("zero-shot-classification", model="valhalla/distilbart-mnli-12-1", device=device)
+    except Exception as e:
+        print(f"Failed to load pipeline on device {device}, trying CPU. Error: {e}")
+        return pipeline("zero-shot-classification", model="valhalla/distilbart-mnli-12-1", device=-1)
+
+model_registry.register('sentiment', _load_pipeline)
+
+
+class TraitEmbedder:
+    """
+    Sentence encoder for the embedding engine. Label embeddings are computed
+    once per label and kept in memory and in LABEL_EMBEDDINGS_FILE, so scoring
+    only has to encode the conversation itself.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL, cache_file=LABEL_EMBEDDINGS_FILE):
+        from transformers import AutoModel, AutoTokenizer
+
+        print("Loading trait embedding model...")
+        self.model_name = model_name
+        self.cache_file = cache_file
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).eval()
+        if torch.cuda.is_available():
+            self.model.to('cuda')
+        self._labels = self._read_cache()  # label prompt -> unit vector
+        self._lock = threading.Lock()
+
+    def _read_cache(self):
         try:
-            # Zero-Shot Classification for custom traits
-            # Using distilbart-mnli-12-1 for speed/efficiency
-            _sentiment_pipeline = pipeline("zero-shot-classification", model="valhalla/distilbart-mnli-12-1", device=device)
-        except Exception as e:
-            print(f"Failed to load pipeline on device {device}, trying CPU. Error: {e}")
-            _sentiment_pipeline = pipeline("zero-shot-classification", model="valhalla/distilbart-mnli-12-1", device=-1)
-            
-    return _sentiment_pipeline
+            with np.load(self.cache_file) as data:
+                if str(data['model']) != self.model_name:
+                    return {}
+                return dict(zip(data['prompts'].tolist(), data['vectors']))
+        except (OSError, KeyError, ValueError):
+            return {}
+
+    def _write_cache(self):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        prompts = list(self._labels)
+        temp_path = self.cache_file + '.tmp.npz'
+        np.savez(temp_path, model=self.model_name, prompts=np.array(prompts),
+                 vectors=np.stack([self._labels[prompt] for prompt in prompts]))
+        os.replace(temp_path, self.cache_file)
+
+    def encode(self, texts):
+        """Unit-length mean-pooled embeddings, one row per text."""
+        inputs = self.tokenizer(texts, return_tensors='pt', padding=True, truncation=True).to(self.model.device)
+        with torch.no_grad():
+            hidden = self.model(**inputs).last_hidden_state
+        mask = inputs['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        pooled = pooled.float().cpu().numpy()
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def label_matrix(self, labels):
+        """(labels x dim) embeddings of the labels' hypotheses, encoding only unseen ones."""
+        prompts = [HYPOTHESIS_TEMPLATE.format(label) for label in labels]
+        with self._lock:
+            missing = [prompt for prompt in dict.fromkeys(prompts) if prompt not in self._labels]
+            if missing:
+                self._labels.update(zip(missing, self.encode(missing)))
+                try:
+                    self._write_cache()
+                except OSError as e:
+                    print(f"Could not save trait label embeddings: {e}")
+            return np.stack([self._labels[prompt] for prompt in prompts])
+
+def _load_embedder():
+    return TraitEmbedder()
+
+model_registry.register('trait_embedder', _load_embedder)
+
+def get_pipeline():
+    # Loaded on demand and unloaded when idle or over budget by the registry
+    return model_registry.get('sentiment')
+
+def _entailment_index(model):
+    for label, index in model.config.label2id.items():
+        if label.lower().startswith("entail"):
+            return index
+    return -1
+
+def _analyze_texts_nli(items, pipe):
+    """
+    Scores items with the zero-shot NLI pipeline.
+    Every (text, label) hypothesis across all items goes through the model
+    together, MAX_PAIRS_PER_PASS per forward pass, instead of one pass per
+    label per text. Labels are mutually exclusive within an item (scores sum
+    to 1), as with the zero-shot pipeline's multi_label=False.
+    """
+    pairs = []
+    for text, labels in items:
+        if text and text.strip():
+            pairs.extend((text, HYPOTHESIS_TEMPLATE.format(label)) for label in labels)
+    if not pairs:
+        return [{} for _ in items]
+
+    model, tokenizer = pipe.model, pipe.tokenizer
+    entailment = _entailment_index(model)
+
+    logits = []
+    for start in range(0, len(pairs), MAX_PAIRS_PER_PASS):
+        chunk = pairs[start:start + MAX_PAIRS_PER_PASS]
+        inputs = tokenizer([premise for premise, _ in chunk], [hypothesis for _, hypothesis in chunk],
+                           return_tensors='pt', padding=True, truncation='only_first').to(model.device)
+        with torch.no_grad():
+            logits.append(model(**inputs).logits[:, entailment].float().cpu().numpy())
+    logits = np.concatenate(logits)
+
+    results = []
+    position = 0
+    for text, labels in items:
+        if not text or not text.strip():
+            results.append({})
+            continue
+        entail = logits[position:position + len(labels)]
+        position += len(labels)
+        exp = np.exp(entail - entail.max())
+        results.append({label: float(score) for label, score in zip(labels, exp / exp.sum())})
+    return results
+
+def _analyze_texts_embedding(items, embedder):
+    """
+    Scores items with the TraitEmbedder: all texts are encoded in one pass and compared to the cached label
+    embeddings with a single matrix product per item; cosine similarities
+    are softmaxed so the scores sum to 1 like the NLI engine's.
+    """
+    texts = [text for text, _labels in items if text and text.strip()]
+    if not texts:
+        return [{} for _ in items]
+
+    encoded = iter(embedder.encode(texts))
+
+    results = []
+    for text, labels in items:
+        if not text or not text.strip():
+            results.append({})
+            continue
+        similarity = embedder.label_matrix(labels) @ next(encoded) / EMBEDDING_TEMPERATURE
+        exp = np.exp(similarity - similarity.max())
+        results.append({label: float(score) for label, score in zip(labels, exp / exp.sum())})
+    return results
+
+def _record(tier, texts, answered, seconds):
+    with _stats_lock:
+        stats = _tier_stats[tier]
+        stats['texts'] += texts
+        stats['answered'] += answered
+        stats['seconds'] += seconds
+
+def _dominant(scores):
+    return max(scores, key=scores.get) if scores else None
+
+def analyze_texts(items, engine=None, fast_path=None, record_stats=True):
+    """
+    Scores several (text, candidate_labels) pairs at once. Lines the lexicon
+    is confident about are answered directly (unless fast_path=False); the
+    rest go to the given model engine ('nli' or 'embedding', default
+    TRAIT_ENGINE) in one batch. record_stats=False keeps the call (e.g. a
+    warm-up) out of tier_stats().
+    Returns one Dict[str, float] per item ({} for empty text).
+    """
+    if fast_path is None:
+        fast_path = LEXICON_FAST_PATH
+    results = [{} if not text or not text.strip() else None for text, _labels in items]
+
+    # index -> (lexicon scores, confidence) for lines with keyword hits the model also scores:
+    # near misses (free, they go to the model anyway) and a sample of confident answers
+    shadow = {}
+    if fast_path:
+        start = time.perf_counter()
+        attempts = answered = 0
+        for i, (text, labels) in enumerate(items):
+            if results[i] is not None:
+                continue
+            attempts += 1
+            scores, confidence = trait_lexicon.score(text, labels, threshold=0.0)
+            if scores is None:
+                continue
+            if confidence < trait_lexicon.CONFIDENCE_THRESHOLD:
+                shadow[i] = (scores, confidence)
+                continue
+            results[i] = scores
+            answered += 1
+            if random.random() < SHADOW_SAMPLE_RATE:
+                shadow[i] = (scores, confidence)
+        if record_stats:
+            _record('lexicon', attempts, answered, time.perf_counter() - start)
+
+    to_model = [i for i, result in enumerate(results) if result is None]
+    sampled = [i for i in shadow if results[i] is not None]
+    if to_model or sampled:
+        engine = engine or TRAIT_ENGINE
+        # Fetched before timing, so (re)loads don't count as inference latency
+        model = model_registry.get(engine_model_name(engine))
+        start = time.perf_counter()
+        batch = [items[i] for i in to_model + sampled]
+        if engine == 'embedding':
+            scored = _analyze_texts_embedding(batch, model)
+        else:
+            scored = _analyze_texts_nli(batch, model)
+        if record_stats:
+            _record('model', len(batch), len(to_model), time.perf_counter() - start)
+
+        for i, scores in zip(to_model + sampled, scored):
+            if record_stats and i in shadow and scores:
+                lexicon_scores, confidence = shadow[i]
+                with _stats_lock:
+                    _shadow.append((confidence, _dominant(lexicon_scores) == _dominant(scores)))
+            if results[i] is None:
+                results[i] = scores
+    return results
+
+def tier_stats():
+    """
+    How each tier has done so far: texts answered, share of all answers,
+    and mean latency per text it looked at, plus how often lexicon guesses
+    agreed with the model.
+    """
+    with _stats_lock:
+        total = sum(stats['answered'] for stats in _tier_stats.values())
+        report = {tier: {
+            'answered': stats['answered'],
+            'hit_rate': stats['answered'] / total if total else 0.0,
+            'mean_ms': stats['seconds'] * 1000 / stats['texts'] if stats['texts'] else 0.0,
+        } for tier, stats in _tier_stats.items()}
+    report['shadow'] = {'samples': len(_shadow), 'agreement': shadow_agreement()}
+    return report
+
+def shadow_agreement(threshold=None):
+    """
+    Share of lexicon guesses with at least the given confidence (any, by
+    default) whose dominant trait matched the model's; None without samples.
+    Samples cover near misses as well as answers, so thresholds on either
+    side of trait_lexicon.CONFIDENCE_THRESHOLD can be compared.
+    """
+    with _stats_lock:
+        agreed = [same for confidence, same in _shadow if threshold is None or confidence >= threshold]
+    return sum(agreed) / len(agreed) if agreed else None
+
+def reset_tier_stats():
+    with _stats_lock:
+        for stats in _tier_stats.values():
+            stats.update(texts=0, answered=0, seconds=0.0)
+        _shadow.clear()
+
+def engine_model_name(engine=None):
+    """Registry name of the model behind an engine (default TRAIT_ENGINE)."""
+    return 'trait_embedder' if (engine or TRAIT_ENGINE) == 'embedding' else 'sentiment'
 
 def analyze_text(text, candidate_labels=None):
     """
@@ -29,19 +309,53 @@ def analyze_text(text, candidate_labels=None):
         return {}
         
     if candidate_labels is None:
-        candidate_labels = ['Intelligent', 'Curious', 'Brave', 'Lazy', 'Friendly']
+        candidate_labels = DEFAULT_LABELS
 
     try:
-        pipe = get_pipeline()
-        # multi_label=True allows multiple traits to apply independently? 
-        # Or False to force them to sum to 1? User probably wants relative dominance.
-        # False (default) makes them mutually exclusive (sum=1). 
-        # Given "score them", mutex is good for finding the DOMINANT one.
-        result = pipe(text[:512], candidate_labels, multi_label=False)
-        
-        # Result format: {'labels': [...], 'scores': [...]}
-        scores = {label: score for label, score in zip(result['labels'], result['scores'])}
-        return scores
+        # Mutually exclusive labels (sum=1): we want the DOMINANT trait
+        return analyze_texts([(text, candidate_labels)])[0]
     except Exception as e:
         print(f"Trait analysis failed: {e}")
         return {}
+
+class TraitAnalysisService:
+    """
+    Analyzes conversations on a background thread. Everything queued while
+    the model is busy is scored together in the next batch, and each result
+    is posted as a TRAIT_ANALYZED event carrying `scores` plus whatever
+    keyword arguments were given to submit(). Every job gets its event;
+    scores is {} when the text was empty or the analysis failed.
+    """
+
+    def __init__(self):
+        self._jobs = []
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='trait-analysis', daemon=True)
+        self._thread.start()
+
+    def submit(self, text, candidate_labels=None, **payload):
+        with self._cond:
+            self._jobs.append((text, candidate_labels or DEFAULT_LABELS, payload))
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._jobs:
+                    self._cond.wait()
+                jobs, self._jobs = self._jobs, []
+
+            try:
+                results = analyze_texts([(text, labels) for text, labels, _payload in jobs])
+            except Exception as e:
+                print(f"Trait analysis failed: {e}")
+                results = [{} for _ in jobs]
+
+            for (_text, _labels, payload), scores in zip(jobs, results):
+                pygame.event.post(pygame.event.Event(TRAIT_ANALYZED, scores=scores, **payload))
+
+def get_analysis_service():
+    global _analysis_service
+    if _analysis_service is None:
+        _analysis_service = TraitAnalysisService()
+    return _analysis_service
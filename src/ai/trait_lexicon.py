@@ -0,0 +1,76 @@
+"""
+Cheap first tier for trait analysis.
+
+Short chat lines like "hi", "you're cute" or "shut up" are scored by keyword
+patterns compiled once per trait, in microseconds. A line is only answered
+here when one trait clearly wins; anything else (no hits, a tie, a weak hit
+in a longer line, a negation like "I don't hate you") returns None and goes
+to the model.
+"""
+import re
+
+# Trait -> keywords/phrases (regex fragments, matched on word boundaries)
+LEXICON = {
+    'Intelligent': [r"smart", r"clever", r"genius", r"brilliant", r"wise", r"math", r"science", r"theory",
+                    r"puzzle", r"solve[sd]?", r"explain", r"physics", r"philosoph\w*"],
+    'Curious': [r"why", r"how come", r"wonder(?:ing)?", r"what(?:'s| is) that", r"curious", r"explore",
+                r"tell me (?:more|about)", r"where do you"],
+    'Brave': [r"brave", r"fearless", r"fight", r"hero", r"courage\w*", r"unafraid",
+              r"let'?s go", r"charge"],
+    'Lazy': [r"lazy", r"nap", r"sleep(?:y|ing)?", r"tired", r"bored", r"couch",
+             r"do nothing", r"chill(?:ing)?"],
+    'Friendly': [r"hi+", r"hello", r"hey", r"love (?:you|u)", r"cute", r"sweet", r"friend\w*", r"thanks?",
+                 r"thank you", r"best bird", r"good (?:bird|boy|girl)", r"miss(?:ed)? you"],
+    'Calm': [r"calm", r"relax\w*", r"peace\w*", r"quiet", r"breathe", r"gentle", r"serene", r"unhurried",
+             r"take it easy"],
+    'Annoying': [r"shut up", r"stupid", r"dumb", r"idiot", r"annoying", r"go away", r"hate (?:you|u)",
+                 r"ugly", r"useless", r"stfu", r"(?:squawk\W*){3,}"],
+}
+
+# Keywords can't tell "you're cute" from "you're not cute": lines with these go to the model
+NEGATORS = [r"not", r"no", r"never", r"\w+n'?t", r"cannot", r"neither", r"nor", r"without"]
+
+# Confidence the lexicon needs to answer (see score() for how it is computed)
+CONFIDENCE_THRESHOLD = 0.75
+# Longer text is left to the model, where context matters more than keywords
+MAX_WORDS = 12
+# Each further hit for the winning trait cuts the remaining doubt by this factor
+HIT_DISCOUNT = 0.2
+# Confidence lost by a line of MAX_WORDS words (scaled down for shorter lines)
+LENGTH_PENALTY = 0.2
+# Added to every candidate's hit count so one hit is not absolute certainty
+SMOOTHING = 0.05
+
+PATTERNS = {trait: re.compile(r"\b(?:" + "|".join(words) + r")\b", re.IGNORECASE)
+            for trait, words in LEXICON.items()}
+NEGATION = re.compile(r"\b(?:" + "|".join(NEGATORS) + r")\b", re.IGNORECASE)
+
+
+def score(text, candidate_labels, threshold=CONFIDENCE_THRESHOLD):
+    """
+    Returns (scores, confidence): scores is {label: score} summing to 1, or
+    None when the lexicon isn't confident enough to answer (or the line is
+    negated); confidence is 0.0 when nothing matched.
+
+    Confidence grows with the winning trait's hits and its share of all hits,
+    and shrinks with the line's length: one keyword in "shut up" is enough,
+    one keyword among ten other words is not.
+    """
+    words = len(text.split()) if text else 0
+    if not words or words > MAX_WORDS:
+        return None, 0.0
+
+    hits = {label: len(PATTERNS[label].findall(text)) if label in PATTERNS else 0
+            for label in candidate_labels}
+    total = sum(hits.values())
+    if not total:
+        return None, 0.0
+
+    norm = total + SMOOTHING * len(hits)
+    scores = {label: (count + SMOOTHING) / norm for label, count in hits.items()}
+    top_hits = max(hits.values())
+    confidence = ((top_hits / total) * (1 - HIT_DISCOUNT ** top_hits)
+                  * (1 - LENGTH_PENALTY * words / MAX_WORDS))
+    if confidence < threshold or NEGATION.search(text):
+        return None, confidence
+    return scores, confidence
@@ -1,14 +1,27 @@
 """
 Backboard.io API client for bird chat functionality.
 """
-import requests
 import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Toggle for using real API vs canned responses
 USE_BACKBOARD_API = True  # Set to True to use real API calls
 
 BASE_URL = "https://app.backboard.io/api"
 
+# Connection pooling: every client shares one session, so requests after the
+# first reuse a kept-alive TLS connection instead of handshaking again
+POOL_CONNECTIONS = 2  # hosts to keep pools for
+POOL_MAXSIZE = 8  # open connections per host (chat windows + background setup)
+CONNECT_RETRIES = 2  # only for failed connects, which never reached the server
+# (connect, read) timeouts in seconds
+SETUP_TIMEOUT = (5, 10)
+MESSAGE_TIMEOUT = (5, 30)
+
 def _load_api_key():
     """Load API key from secrets.txt file."""
     secrets_path = os.path.join(os.path.dirname(__file__), '..', '..', 'secrets.txt')
@@ -25,6 +38,27 @@ def _load_api_key():
 API_KEY = _load_api_key()
 HEADERS = {"X-API-Key": API_KEY} if API_KEY else {}
 
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """The shared, pooled session used by every BackboardClient."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                max_retries=Retry(total=CONNECT_RETRIES, connect=CONNECT_RETRIES, read=0, status=0,
+                                  other=0, backoff_factor=0.3),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(HEADERS)
+            _session = session
+        return _session
+
 
 class BackboardClient:
     """Client for interacting with backboard.io API."""
@@ -32,14 +66,14 @@ class BackboardClient:
     def __init__(self, bird_data, event_data=None):
         self.bird_data = bird_data
         self.event_data = event_data
-        self.assistant_id = bird_data.get('backboard_assistant_id')
-        self.thread_id = bird_data.get('backboard_thread_id')
+        self.assistant_id = bird_data['backboard_assistant_id']
+        self.thread_id = bird_data['backboard_thread_id']
         self.species = bird_data.get('species', 'Bird')
         
     def _build_system_prompt(self):
         """Build a system prompt based on bird data."""
         species = self.species
-        personality = self.bird_data.get('personality', '')
+        personality = self.bird_data['personality']
         
         prompt = f"You are a {species}. Use short chirpy sentences with occasional bird sounds (*chirp*, *tweet*). Max 1-2 sentences."
         if personality:
@@ -58,7 +92,7 @@ class BackboardClient:
         try:
             # Create assistant if needed
             if not self.assistant_id:
-                response = requests.post(
+                response = get_session().post(
                     f"{BASE_URL}/assistants",
                     json={
                         "name": f"{self.species} Chat",
@@ -69,8 +103,7 @@ class BackboardClient:
                         "embedding_model_name": "text-embedding-3-large",
                         "memory": "Auto"
                     },
-                    headers=HEADERS,
-                    timeout=10
+                    timeout=SETUP_TIMEOUT
                 )
                 if response.status_code == 200:
                     self.assistant_id = response.json().get("assistant_id")
@@ -80,11 +113,10 @@ class BackboardClient:
             
             # Create thread if needed
             if not self.thread_id and self.assistant_id:
-                response = requests.post(
+                response = get_session().post(
                     f"{BASE_URL}/assistants/{self.assistant_id}/threads",
                     json={},
-                    headers=HEADERS,
-                    timeout=10
+                    timeout=SETUP_TIMEOUT
                 )
                 if response.status_code == 200:
                     self.thread_id = response.json().get("thread_id")
@@ -96,12 +128,12 @@ class BackboardClient:
             # If we have event data and an assistant exists, force update the prompt
             if self.event_data and self.assistant_id:
                 try:
-                    requests.patch(
+                    get_session().patch(
                         f"{BASE_URL}/assistants/{self.assistant_id}",
                         json={"system_prompt": self._build_system_prompt()},
-                        headers=HEADERS
+                        timeout=SETUP_TIMEOUT
                     )
-                except:
+                except requests.RequestException:
                     print("Failed to update assistant prompt for event.")
 
             return True
@@ -120,15 +152,14 @@ class BackboardClient:
                 return None
         
         try:
-            response = requests.post(
+            response = get_session().post(
                 f"{BASE_URL}/threads/{self.thread_id}/messages",
-                headers=HEADERS,
                 data={
                     "content": message,
                     "stream": "false",
                     "memory": "Auto"
                 },
-                timeout=30
+                timeout=MESSAGE_TIMEOUT
             )
             
             if response.status_code == 200:
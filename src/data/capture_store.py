@@ -0,0 +1,185 @@
+"""
+Content-addressed store for camera captures and bird crops.
+
+Images are keyed by a hash of their pixels and kept in a sharded tree
+(objects/ab/cd/<hash>.png), so an identical or re-processed image is stored
+once. Each object has a small .refs file counting the bird records that
+point at it; when the count drops to zero the image is removed.
+
+Because an object's path only depends on its pixels, captures can be handed
+back to the caller straight away and encoded to PNG on a background writer;
+ensure_written(path) waits for that when a file is about to be read.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.data import thumbnails
+
+CAPTURES_DIR = os.path.join('assets', 'captures')
+OBJECTS_DIR = os.path.join(CAPTURES_DIR, 'objects')
+
+_lock = threading.Lock()
+_pending = {}  # path -> Future for objects still being encoded
+_writer = None
+
+
+def content_hash(size, mode, pixels):
+    """Hash of raw pixel data, independent of how the image is encoded on disk."""
+    digest = hashlib.sha1(f"{size[0]}x{size[1]}:{mode}:".encode())
+    digest.update(pixels)
+    return digest.hexdigest()
+
+
+def object_path(digest):
+    return os.path.join(OBJECTS_DIR, digest[:2], digest[2:4], f"{digest}.png")
+
+
+def _refs_path(path):
+    return os.path.splitext(path)[0] + '.refs'
+
+
+def _read_refs(path):
+    try:
+        with open(_refs_path(path), 'r') as f:
+            return int(f.read().strip() or 0)
+    except (IOError, ValueError):
+        return 0
+
+
+def _write_refs(path, count):
+    refs_path = _refs_path(path)
+    tmp_path = refs_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(str(count))
+    os.replace(tmp_path, refs_path)
+
+
+def is_stored(path):
+    """True if path points into the content-addressed tree."""
+    return bool(path) and os.path.abspath(path).startswith(os.path.abspath(OBJECTS_DIR) + os.sep)
+
+
+def _get_writer():
+    global _writer
+    if _writer is None:
+        _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='capture-writer')
+    return _writer
+
+
+def _write_object(path, save):
+    tmp_path = path + '.tmp.png'
+    save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_in_background(path, save):
+    try:
+        _write_object(path, save)
+    except Exception as e:
+        print(f"Error writing image {path}: {e}")
+    finally:
+        with _lock:
+            _pending.pop(path, None)
+
+
+def _put(digest, save, background=False):
+    """
+    Stores an object via save(tmp_path) unless it already exists; takes a
+    reference. With background=True the save runs on the writer thread.
+    """
+    path = object_path(digest)
+    with _lock:
+        if not os.path.exists(path) and path not in _pending:
+            directory = os.path.dirname(path)
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+            if background:
+                _pending[path] = _get_writer().submit(_write_in_background, path, save)
+            else:
+                _write_object(path, save)
+        _write_refs(path, _read_refs(path) + 1)
+    return path
+
+
+def ensure_written(path):
+    """Blocks until a background write of path (if any) has finished."""
+    with _lock:
+        job = _pending.get(path)
+    if job is not None:
+        job.result()
+
+
+def flush():
+    """Blocks until every background image write has finished."""
+    with _lock:
+        jobs = list(_pending.values())
+    for job in jobs:
+        job.result()
+
+
+def store_array(pixels):
+    """
+    Stores an HxWx3 RGB uint8 array (C-contiguous, not modified afterwards)
+    and returns its path at once; the PNG is encoded in the background.
+    """
+    from PIL import Image
+
+    height, width = pixels.shape[:2]
+    digest = content_hash((width, height), 'RGB', pixels)
+    return _put(digest, lambda tmp_path: Image.fromarray(pixels).save(tmp_path, format='PNG'), background=True)
+
+
+def retain(path):
+    """Takes another reference to a stored image. Returns path."""
+    with _lock:
+        _write_refs(path, _read_refs(path) + 1)
+    return path
+
+
+def release(path):
+    """
+    Drops one reference to an image and deletes it once nothing points at it.
+    Paths from before the store existed belonged to exactly one bird, so they
+    are deleted outright.
+    """
+    if not path:
+        return
+    ensure_written(path)
+    if not os.path.exists(path):
+        return
+
+    with _lock:
+        if is_stored(path):
+            count = _read_refs(path) - 1
+            if count > 0:
+                _write_refs(path, count)
+                return
+            if os.path.exists(_refs_path(path)):
+                os.remove(_refs_path(path))
+        os.remove(path)
+        thumbnails.remove_thumbnails(path)
+    print(f"Removed unreferenced image: {path}")
+
+
+def collect_garbage():
+    """Removes any stored object whose reference count has dropped to zero. Returns how many."""
+    removed = 0
+    if not os.path.exists(OBJECTS_DIR):
+        return removed
+
+    with _lock:
+        for root, _dirs, files in os.walk(OBJECTS_DIR):
+            for filename in files:
+                path = os.path.join(root, filename)
+                # Still being written
+                if path in _pending or path[:-len('.tmp.png')] in _pending:
+                    continue
+                if filename.endswith('.tmp.png') or (filename.endswith('.png') and _read_refs(path) <= 0):
+                    os.remove(path)
+                    if os.path.exists(_refs_path(path)):
+                        os.remove(_refs_path(path))
+                    thumbnails.remove_thumbnails(path)
+                    removed += 1
+    return removed
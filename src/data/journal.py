@@ -0,0 +1,108 @@
+"""
+Append-only change journal and crash-safe file helpers for the bird archive.
+"""
+import json
+import os
+import tempfile
+
+
+def atomic_write_json(path, data):
+    """
+    Writes data to a temp file in the same directory, then renames it over
+    path, so a crash leaves either the old file or the new one, never half.
+    """
+    directory = os.path.dirname(path) or '.'
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Journal:
+    """A file of one-JSON-record-per-line deltas."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def append(self, record):
+        if self._file is None:
+            self._file = open(self.path, 'a')
+        start = self._file.tell()
+        try:
+            self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError:
+            # Don't leave a partial line for later records to be appended after
+            try:
+                self._file.truncate(start)
+            except OSError:
+                pass
+            self.close()
+            raise
+
+    def size(self):
+        if self._file is not None:
+            return self._file.tell()
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def rotate(self, rotated_path):
+        """
+        Moves the current journal aside so new records start a fresh file. If
+        an earlier rotated journal is still there (its compaction failed), the
+        current records are appended to it instead of overwriting it.
+        """
+        self.close()
+        if not os.path.exists(self.path):
+            return
+        if not os.path.exists(rotated_path):
+            os.replace(self.path, rotated_path)
+            return
+
+        with open(self.path, 'r') as current, open(rotated_path, 'a+') as rotated:
+            rotated.seek(0, os.SEEK_END)
+            if rotated.tell():
+                rotated.seek(rotated.tell() - 1)
+                if rotated.read(1) != '\n':
+                    # Keep a torn last line from swallowing the first appended record
+                    rotated.write('\n')
+            rotated.write(current.read())
+            rotated.flush()
+            os.fsync(rotated.fileno())
+        os.remove(self.path)
+
+    @staticmethod
+    def read(path):
+        """
+        Returns (records, intact) for a journal file. Reading stops at a torn
+        final line, in which case intact is False and the file must not be
+        appended to until it has been folded away.
+        """
+        records = []
+        if not os.path.exists(path):
+            return records, True
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Only the last write can be partial after a crash
+                    print(f"Ignoring torn journal record in {path}")
+                    return records, False
+        return records, True
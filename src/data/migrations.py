@@ -0,0 +1,71 @@
+"""
+Versioned bird-record schema.
+
+Every field a bird record is guaranteed to carry is introduced by a numbered
+migration below. Archives remember the version they were written at, and
+only the migrations newer than that run, once, when the archive is loaded.
+New records get every migration applied up front, so code reading a record
+can index fields directly instead of scattering dict.get defaults around.
+"""
+import uuid
+
+from src.ai.label_policy import sprite_family
+
+MIGRATIONS = {}  # version -> function(bird) that upgrades one record in place
+
+
+def migration(version):
+    """Registers the function that upgrades a record to `version`."""
+    def register(func):
+        if version in MIGRATIONS:
+            raise ValueError(f"Duplicate bird schema migration {version}")
+        MIGRATIONS[version] = func
+        return func
+    return register
+
+
+@migration(1)
+def add_id_and_status(bird):
+    if 'id' not in bird:
+        bird['id'] = str(uuid.uuid4())
+    if 'status' not in bird:
+        bird['status'] = 'field'
+
+
+@migration(2)
+def add_personality_fields(bird):
+    bird.setdefault('name', None)
+    bird.setdefault('personality', None)
+    bird.setdefault('trait_scores', {})
+    # Superseded by trait_scores
+    bird.pop('emotion_scores', None)
+
+
+@migration(3)
+def add_backboard_ids(bird):
+    bird.setdefault('backboard_assistant_id', None)
+    bird.setdefault('backboard_thread_id', None)
+
+
+@migration(4)
+def add_sprite_family(bird):
+    if 'sprite_family' not in bird:
+        bird['sprite_family'] = sprite_family(bird.get('species'))
+
+
+SCHEMA_VERSION = max(MIGRATIONS)
+
+
+def migrate(birds, from_version):
+    """Upgrades records written at from_version to SCHEMA_VERSION, in place."""
+    for version in range(from_version + 1, SCHEMA_VERSION + 1):
+        upgrade = MIGRATIONS[version]
+        for bird in birds:
+            upgrade(bird)
+    return birds
+
+
+def upgrade_record(bird):
+    """Brings a brand-new record up to the current schema, in place."""
+    migrate([bird], 0)
+    return bird
@@ -0,0 +1,360 @@
+"""
+In-memory, indexed view of the saved bird archive.
+"""
+import json
+import os
+import threading
+
+from src.data import migrations
+from src.data.journal import Journal, atomic_write_json
+from src.data.write_behind import WriteBehindQueue
+
+# Fold the journal into the snapshot once it grows past this many bytes
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# Fields iter_birds can order by; prefix with '-' for descending
+ORDER_FIELDS = ('timestamp', 'species', 'name')
+# Records copied out per lock acquisition while iterating
+PAGE_SIZE = 500
+
+
+def parse_order(order_by):
+    """Returns (field, descending) for an order_by string, or (None, False) for archive order."""
+    if order_by is None:
+        return None, False
+    descending = order_by.startswith('-')
+    field = order_by.lstrip('-')
+    if field not in ORDER_FIELDS:
+        raise ValueError(f"Can't order birds by '{order_by}'")
+    return field, descending
+
+
+class BirdRepository:
+    """
+    Loads the archive once and answers queries from per-id and per-status
+    indexes. Mutations apply to memory immediately; a write-behind queue
+    appends them to a journal next to the snapshot on a background thread,
+    and the journal is folded back into the snapshot once it gets large.
+    Records handed out are shallow copies so callers can't desync the indexes.
+
+    Lock order is always _io_lock before _lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        base = os.path.splitext(path)[0]
+        self.journal_path = base + '.journal'
+        self.rotated_journal_path = base + '.journal.1'
+
+        self._lock = threading.RLock()     # guards the in-memory indexes
+        self._io_lock = threading.RLock()  # guards the journal and snapshot files
+        self._birds = {}      # id -> record, in insertion order
+        self._by_status = {}  # status -> {id: record}
+        self._order_cache = {}  # (status, order_by) -> [id], dropped on any change
+        self._journal = Journal(self.journal_path)
+        self._compaction = None
+        self._load()
+        self._writer = WriteBehindQueue(self._persist)
+
+    def flush(self):
+        """Writes every queued mutation to the journal before returning. Returns False if that failed."""
+        return self._writer.flush()
+
+    def close(self):
+        """Flushes queued mutations, waits for any compaction and closes the journal."""
+        self._writer.close()
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+        with self._io_lock:
+            self._journal.close()
+
+    # --- Loading / Persistence ---
+
+    def _load(self):
+        version, birds = self._read_snapshot()
+
+        # Deltas newer than the snapshot. The rotated journal only exists if
+        # a compaction was interrupted; replaying it is harmless because every
+        # record sets absolute values. Fold it (and any torn journal) straight
+        # away so nothing is appended after a bad record.
+        records = []
+        fold = os.path.exists(self.rotated_journal_path)
+        for path in (self.rotated_journal_path, self.journal_path):
+            journal_records, intact = Journal.read(path)
+            records.extend(journal_records)
+            if not intact:
+                fold = True
+
+        if version < migrations.SCHEMA_VERSION:
+            # The journal was written alongside the old snapshot, so it is in
+            # the old schema too: fold it in first, then upgrade everything once
+            birds = replay_raw(birds, records)
+            migrations.migrate(birds, version)
+            print(f"Upgraded bird archive from schema {version} to {migrations.SCHEMA_VERSION}")
+            for bird in birds:
+                self._index(bird)
+            fold = True
+        else:
+            for bird in birds:
+                self._index(bird)
+            for record in records:
+                self._apply(record)
+
+        if fold:
+            self._write_snapshot()
+
+    def _read_snapshot(self):
+        try:
+            return read_snapshot(self.path)
+        except (json.JSONDecodeError, IOError):
+            print("Error loading birds data.")
+            return migrations.SCHEMA_VERSION, []
+
+    def _snapshot_data(self, birds):
+        return {'schema_version': migrations.SCHEMA_VERSION, 'birds': birds}
+
+    def _write_snapshot(self):
+        """Synchronously rewrites the snapshot and drops both journals."""
+        try:
+            self._journal.close()
+            atomic_write_json(self.path, self._snapshot_data(list(self._birds.values())))
+            for path in (self.journal_path, self.rotated_journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return True
+        except IOError as e:
+            print(f"Error saving bird data: {e}")
+            return False
+
+    def _record(self, key, record):
+        """Queues a delta for the journal, then applies it in memory."""
+        self._writer.submit(key, record)
+        self._apply(record)
+        return True
+
+    def _persist(self, records):
+        """Write-behind sink: appends a batch of deltas to the journal."""
+        with self._io_lock:
+            for record in records:
+                self._journal.append(record)
+
+            if self._journal.size() >= JOURNAL_COMPACT_BYTES:
+                self.compact()
+
+    def _apply(self, record):
+        self._order_cache.clear()
+        op = record['op']
+        if op == 'add':
+            bird = dict(record['bird'])
+            existing = self._birds.get(bird['id'])
+            if existing is not None:
+                self._unindex(existing)
+            self._index(bird)
+        elif op == 'update':
+            bird = self._birds.get(record['id'])
+            if bird is not None:
+                old_status = bird['status']
+                bird.update(record['set'])
+                bird['id'] = record['id']  # the id is the index key, never let it drift
+                if bird['status'] != old_status:
+                    self._move_status(bird, old_status)
+        elif op == 'delete':
+            bird = self._birds.get(record['id'])
+            if bird is not None:
+                self._unindex(bird)
+
+    def compact(self):
+        """
+        Starts folding the journal into the snapshot on a background thread.
+        The journal is rotated first so new mutations never wait on the dump.
+        """
+        with self._io_lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return self._compaction
+
+            self._journal.rotate(self.rotated_journal_path)
+            # Copy the records; the dump runs while the main thread keeps
+            # mutating. Anything queued but not yet journaled is in the copy
+            # too and will land in the new journal, where replay is harmless.
+            with self._lock:
+                snapshot = [dict(b) for b in self._birds.values()]
+
+            self._compaction = threading.Thread(target=self._run_compaction, args=(snapshot,), daemon=True)
+            self._compaction.start()
+            return self._compaction
+
+    def _run_compaction(self, snapshot):
+        try:
+            atomic_write_json(self.path, self._snapshot_data(snapshot))
+            os.remove(self.rotated_journal_path)
+        except (IOError, OSError) as e:
+            # The rotated journal stays on disk and is replayed on next load
+            print(f"Journal compaction failed: {e}")
+
+    # --- Index maintenance ---
+
+    def _index(self, bird):
+        self._birds[bird['id']] = bird
+        self._by_status.setdefault(bird['status'], {})[bird['id']] = bird
+
+    def _move_status(self, bird, old_status):
+        bucket = self._by_status.get(old_status)
+        if bucket is not None:
+            bucket.pop(bird['id'], None)
+            if not bucket:
+                del self._by_status[old_status]
+        self._by_status.setdefault(bird['status'], {})[bird['id']] = bird
+
+    def _unindex(self, bird):
+        self._birds.pop(bird['id'], None)
+        bucket = self._by_status.get(bird['status'])
+        if bucket is not None:
+            bucket.pop(bird['id'], None)
+            if not bucket:
+                del self._by_status[bird['status']]
+
+    # --- Queries ---
+
+    def all(self):
+        with self._lock:
+            return [dict(b) for b in self._birds.values()]
+
+    def get(self, bird_id):
+        with self._lock:
+            bird = self._birds.get(bird_id)
+            return dict(bird) if bird else None
+
+    def by_status(self, status):
+        with self._lock:
+            return [dict(b) for b in self._by_status.get(status, {}).values()]
+
+    def count(self, status=None):
+        with self._lock:
+            if status is None:
+                return len(self._birds)
+            return len(self._by_status.get(status, {}))
+
+    def iter_birds(self, status=None, offset=0, limit=None, order_by=None):
+        """
+        Yields copies of one window of birds without copying the rest.
+        The sorted id list is cached until the next mutation.
+        """
+        with self._lock:
+            ids = self._sorted_ids(status, order_by)
+        end = len(ids) if limit is None else min(len(ids), offset + limit)
+
+        for start in range(offset, end, PAGE_SIZE):
+            with self._lock:
+                page = [dict(self._birds[bird_id])
+                        for bird_id in ids[start:min(end, start + PAGE_SIZE)]
+                        if bird_id in self._birds]
+            yield from page
+
+    def _sorted_ids(self, status, order_by):
+        key = (status, order_by)
+        ids = self._order_cache.get(key)
+        if ids is None:
+            field, descending = parse_order(order_by)
+            birds = self._birds.values() if status is None else self._by_status.get(status, {}).values()
+            if field is not None:
+                # Missing values sort last in ascending order
+                birds = sorted(birds, key=lambda b: (b.get(field) is None, b.get(field) or ''), reverse=descending)
+            ids = [b['id'] for b in birds]
+            self._order_cache[key] = ids
+        return ids
+
+    # --- Mutations ---
+
+    def add(self, bird_data):
+        """Indexes a new bird (must already carry an id and status)."""
+        with self._lock:
+            return self._record(bird_data['id'], {'op': 'add', 'bird': dict(bird_data)})
+
+    def update(self, bird_id, updates):
+        """Merges updates into a bird, re-indexing if its status changed."""
+        with self._lock:
+            if bird_id not in self._birds:
+                return False
+            return self._record(bird_id, {'op': 'update', 'id': bird_id, 'set': dict(updates)})
+
+    def delete(self, bird_id):
+        with self._lock:
+            if bird_id not in self._birds:
+                return False
+            return self._record(bird_id, {'op': 'delete', 'id': bird_id})
+
+    def replace_all(self, birds):
+        """Swaps the whole archive for the given list."""
+        # Let any batch the writer thread is holding reach the journal first,
+        # so it can't land on top of the new snapshot
+        self._writer.flush()
+        with self._io_lock, self._lock:
+            compaction = self._compaction
+            if compaction is not None:
+                compaction.join()
+
+            # Queued deltas describe the archive being replaced
+            self._writer.discard()
+            self._birds = {}
+            self._by_status = {}
+            self._order_cache.clear()
+            for bird in birds:
+                self._index(migrations.upgrade_record(dict(bird)))
+            return self._write_snapshot()
+
+
+def read_snapshot(path):
+    """
+    Returns (schema_version, birds) from a snapshot file. A bare list is the
+    unversioned format. Raises on an unreadable file.
+    """
+    if not os.path.exists(path):
+        return migrations.SCHEMA_VERSION, []
+
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    if isinstance(data, list):
+        return 0, data
+
+    version = data.get('schema_version', 0)
+    if version > migrations.SCHEMA_VERSION:
+        print(f"Bird archive schema {version} is newer than this build ({migrations.SCHEMA_VERSION}).")
+    return version, data.get('birds', [])
+
+
+def read_archive(path):
+    """
+    Returns the birds of a JSON archive (snapshot plus any journals), upgraded
+    to the current schema in memory. Unlike opening a BirdRepository, nothing
+    on disk is rewritten. Raises on an unreadable snapshot.
+    """
+    version, birds = read_snapshot(path)
+    base = os.path.splitext(path)[0]
+    records = []
+    for journal_path in (base + '.journal.1', base + '.journal'):
+        journal_records, _intact = Journal.read(journal_path)
+        records.extend(journal_records)
+    return migrations.migrate(replay_raw(birds, records), version)
+
+
+def replay_raw(birds, records):
+    """
+    Applies journal records to a plain list of (possibly pre-schema) records,
+    keeping their order. Records without an id can't have been journaled.
+    """
+    by_key = {}
+    for i, bird in enumerate(birds):
+        by_key[bird.get('id', ('unsaved', i))] = bird
+
+    for record in records:
+        op = record['op']
+        if op == 'add':
+            by_key[record['bird']['id']] = dict(record['bird'])
+        elif op == 'update' and record['id'] in by_key:
+            by_key[record['id']].update(record['set'])
+        elif op == 'delete':
+            by_key.pop(record['id'], None)
+
+    return list(by_key.values())
@@ -0,0 +1,304 @@
+"""
+SQLite-backed bird archive with indexed queries.
+"""
+import json
+import sqlite3
+import threading
+
+from src.data import migrations
+from src.data.repository import PAGE_SIZE, parse_order, read_archive
+
+# Fields stored in their own columns (and indexed) rather than in the JSON blob
+COLUMN_FIELDS = ('id', 'status', 'species', 'timestamp')
+# SQL for each orderable field; the ones without a column are read from the JSON blob
+ORDER_EXPRESSIONS = {
+    'timestamp': "timestamp",
+    'species': "species",
+    'name': "json_extract(data, '$.name')",
+}
+# meta key set once saved_birds.json has been imported
+JSON_IMPORTED_KEY = 'json_imported'
+# Chat state lives in the chats table
+CHAT_FIELDS = ('backboard_assistant_id', 'backboard_thread_id')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS birds (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    species TEXT,
+    timestamp TEXT,
+    data TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_birds_status ON birds (status);
+CREATE INDEX IF NOT EXISTS idx_birds_species ON birds (species);
+CREATE INDEX IF NOT EXISTS idx_birds_timestamp ON birds (timestamp);
+
+CREATE TABLE IF NOT EXISTS trait_scores (
+    bird_id TEXT NOT NULL REFERENCES birds (id) ON DELETE CASCADE,
+    trait TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (bird_id, trait)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS chats (
+    bird_id TEXT PRIMARY KEY REFERENCES birds (id) ON DELETE CASCADE,
+    backboard_assistant_id TEXT,
+    backboard_thread_id TEXT
+);
+"""
+
+
+class SQLiteBirdRepository:
+    """
+    Same interface as BirdRepository, but every query and update goes
+    through indexed SQL so nothing scales with the size of the archive.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Runs the record migrations newer than the database, once."""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= migrations.SCHEMA_VERSION:
+            return
+
+        birds = self.all()
+        if birds:
+            self.replace_all(migrations.migrate(birds, version))
+            print(f"Upgraded bird database from schema {version} to {migrations.SCHEMA_VERSION}")
+        self._conn.execute(f"PRAGMA user_version = {migrations.SCHEMA_VERSION}")
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return row['value'] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def flush(self):
+        """Nothing to do; every update is committed before it returns."""
+        return True
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Row <-> record conversion ---
+
+    def _split(self, bird_data):
+        """Splits a record into (columns, extra data, trait scores, chat fields)."""
+        columns = {}
+        extra = {}
+        traits = None
+        chat = {}
+        for key, value in bird_data.items():
+            if key in COLUMN_FIELDS:
+                columns[key] = value
+            elif key in CHAT_FIELDS:
+                chat[key] = value
+            elif key == 'trait_scores':
+                traits = value or {}
+            else:
+                extra[key] = value
+        return columns, extra, traits, chat
+
+    def _records(self, rows):
+        """Builds full records from birds rows, fetching traits and chats for just those ids."""
+        birds = []
+        by_id = {}
+        for row in rows:
+            bird = json.loads(row['data'])
+            for field in COLUMN_FIELDS:
+                if row[field] is not None or field in ('id', 'status'):
+                    bird[field] = row[field]
+            # A bird without score rows still has the (empty) field every record carries
+            bird['trait_scores'] = {}
+            birds.append(bird)
+            by_id[row['id']] = bird
+
+        if not by_id:
+            return birds
+
+        ids = list(by_id)
+        placeholders = ",".join("?" * len(ids))
+        for row in self._conn.execute(
+                f"SELECT bird_id, trait, score FROM trait_scores WHERE bird_id IN ({placeholders})", ids):
+            by_id[row['bird_id']]['trait_scores'][row['trait']] = row['score']
+
+        for row in self._conn.execute(
+                f"SELECT * FROM chats WHERE bird_id IN ({placeholders})", ids):
+            for field in CHAT_FIELDS:
+                by_id[row['bird_id']][field] = row[field]
+
+        return birds
+
+    def _write_traits(self, bird_id, traits):
+        self._conn.execute("DELETE FROM trait_scores WHERE bird_id = ?", (bird_id,))
+        self._conn.executemany(
+            "INSERT INTO trait_scores (bird_id, trait, score) VALUES (?, ?, ?)",
+            [(bird_id, trait, score) for trait, score in traits.items()])
+
+    def _write_chat(self, bird_id, chat):
+        self._conn.execute("INSERT OR IGNORE INTO chats (bird_id) VALUES (?)", (bird_id,))
+        assignments = ", ".join(f"{field} = ?" for field in chat)
+        self._conn.execute(f"UPDATE chats SET {assignments} WHERE bird_id = ?",
+                           list(chat.values()) + [bird_id])
+
+    def _insert(self, bird_data):
+        columns, extra, traits, chat = self._split(bird_data)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO birds (id, status, species, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+            (columns['id'], columns['status'], columns.get('species'), columns.get('timestamp'),
+             json.dumps(extra)))
+        if traits is not None:
+            self._write_traits(columns['id'], traits)
+        if chat:
+            self._write_chat(columns['id'], chat)
+
+    # --- Queries ---
+
+    def all(self):
+        with self._lock:
+            return self._records(self._conn.execute("SELECT * FROM birds ORDER BY rowid"))
+
+    def get(self, bird_id):
+        with self._lock:
+            birds = self._records(self._conn.execute("SELECT * FROM birds WHERE id = ?", (bird_id,)))
+            return birds[0] if birds else None
+
+    def by_status(self, status):
+        with self._lock:
+            return self._records(self._conn.execute(
+                "SELECT * FROM birds WHERE status = ? ORDER BY rowid", (status,)))
+
+    def count(self, status=None):
+        with self._lock:
+            if status is None:
+                return self._conn.execute("SELECT COUNT(*) FROM birds").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM birds WHERE status = ?", (status,)).fetchone()[0]
+
+    def iter_birds(self, status=None, offset=0, limit=None, order_by=None):
+        """Yields one window of birds, fetched PAGE_SIZE rows at a time."""
+        field, descending = parse_order(order_by)
+        where, params = ("WHERE status = ?", [status]) if status is not None else ("", [])
+        # Missing values sort last in ascending order, matching BirdRepository
+        if field is None:
+            order = "rowid"
+        else:
+            column = ORDER_EXPRESSIONS[field]
+            if descending:
+                order = f"{column} IS NULL DESC, {column} DESC, rowid"
+            else:
+                order = f"{column} IS NULL, {column} ASC, rowid"
+
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = PAGE_SIZE if remaining is None else min(PAGE_SIZE, remaining)
+            with self._lock:
+                page = self._records(self._conn.execute(
+                    f"SELECT * FROM birds {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                    params + [page_size, offset]))
+            yield from page
+
+            if len(page) < page_size:
+                return
+            offset += len(page)
+            if remaining is not None:
+                remaining -= len(page)
+
+    # --- Mutations ---
+
+    def add(self, bird_data):
+        """Inserts a new bird (must already carry an id and status)."""
+        try:
+            with self._lock, self._conn:
+                self._insert(bird_data)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error saving bird data: {e}")
+            return False
+
+    def update(self, bird_id, updates):
+        """Updates only the columns/tables touched by the given fields."""
+        updates = {k: v for k, v in updates.items() if k != 'id'}
+        columns, extra, traits, chat = self._split(updates)
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute("SELECT data FROM birds WHERE id = ?", (bird_id,)).fetchone()
+                if row is None:
+                    return False
+
+                if columns:
+                    assignments = ", ".join(f"{field} = ?" for field in columns)
+                    self._conn.execute(f"UPDATE birds SET {assignments} WHERE id = ?",
+                                       list(columns.values()) + [bird_id])
+                if extra:
+                    data = json.loads(row['data'])
+                    data.update(extra)
+                    self._conn.execute("UPDATE birds SET data = ? WHERE id = ?", (json.dumps(data), bird_id))
+                if traits is not None:
+                    self._write_traits(bird_id, traits)
+                if chat:
+                    self._write_chat(bird_id, chat)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error saving bird data: {e}")
+            return False
+
+    def delete(self, bird_id):
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.execute("DELETE FROM birds WHERE id = ?", (bird_id,))
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Error deleting bird data: {e}")
+            return False
+
+    def replace_all(self, birds):
+        """Swaps the whole archive for the given list."""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM birds")
+                for bird in birds:
+                    self._insert(migrations.upgrade_record(dict(bird)))
+            return True
+        except sqlite3.Error as e:
+            print(f"Error saving bird data: {e}")
+            return False
+
+
+def import_from_json(repository, json_path):
+    """
+    One-shot import of an existing saved_birds.json into a SQLite repository,
+    read without modifying the JSON files. The import is recorded in the
+    database once it has committed, so a failed or interrupted one is retried
+    the next time and a finished one never runs again.
+    Returns the number of birds imported.
+    """
+    try:
+        birds = read_archive(json_path)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Could not import {json_path}: {e}")
+        return 0
+
+    if birds and not repository.replace_all(birds):
+        return 0
+    repository.set_meta(JSON_IMPORTED_KEY, json_path)
+    if birds:
+        print(f"Imported {len(birds)} birds from {json_path}")
+    return len(birds)
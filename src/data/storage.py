@@ -1,97 +1,121 @@
-import json
 import os
 import uuid
 
+from src.data import capture_store, migrations, transcripts
+from src.data.repository import BirdRepository
+
+# CONFIGURATION
+# 'json' keeps the archive in saved_birds.json, 'sqlite' in saved_birds.db
+STORAGE_BACKEND = 'json'
+
 DATA_FILE = os.path.join('assets', 'saved_birds.json')
+SQLITE_FILE = os.path.join('assets', 'saved_birds.db')
+
+_repository = None
+
+def get_repository():
+    """Returns the process-wide bird repository, loading it on first use."""
+    global _repository
+    if _repository is None:
+        if STORAGE_BACKEND == 'sqlite':
+            _repository = _open_sqlite_repository()
+        else:
+            _repository = BirdRepository(DATA_FILE)
+    return _repository
+
+def _open_sqlite_repository():
+    from src.data.sqlite_repository import JSON_IMPORTED_KEY, SQLiteBirdRepository, import_from_json
+
+    repository = SQLiteBirdRepository(SQLITE_FILE)
+    # Carry an existing JSON sanctuary over until an import has completed. A
+    # database that already has birds but no record of the import predates
+    # the record, so it was imported already.
+    if repository.get_meta(JSON_IMPORTED_KEY) is None:
+        if repository.count():
+            repository.set_meta(JSON_IMPORTED_KEY, DATA_FILE)
+        elif os.path.exists(DATA_FILE):
+            import_from_json(repository, DATA_FILE)
+    return repository
+
+def flush():
+    """Blocks until every queued storage write has reached disk."""
+    if _repository is not None:
+        _repository.flush()
+
+def close_repository():
+    """Flushes and drops the loaded repository so the next call reloads from disk."""
+    global _repository
+    if _repository is not None:
+        _repository.close()
+    _repository = None
 
 def load_birds():
     """Returns a list of saved bird dictionaries."""
-    if not os.path.exists(DATA_FILE):
-        return []
-    
-    try:
-        with open(DATA_FILE, 'r') as f:
-            birds = json.load(f)
-            # Migration/Sanity Check: ensure all have id and status
-            modified = False
-            for bird in birds:
-                if 'id' not in bird:
-                    bird['id'] = str(uuid.uuid4())
-                    modified = True
-                if 'status' not in bird:
-                    bird['status'] = 'field'
-                    modified = True
-            
-            if modified:
-                save_all_birds(birds)
-            
-            return birds
-    except (json.JSONDecodeError, IOError):
-        print("Error loading birds data.")
-        return []
+    return get_repository().all()
+
+def get_bird(bird_id):
+    """Returns a single bird dictionary, or None if it doesn't exist."""
+    return get_repository().get(bird_id)
 
 def save_all_birds(birds):
     """Helper to save the entire list."""
-    try:
-        with open(DATA_FILE, 'w') as f:
-            json.dump(birds, f, indent=4)
-        return True
-    except IOError as e:
-        print(f"Error saving bird data: {e}")
-        return False
+    return get_repository().replace_all(birds)
 
 def save_bird(bird_data):
     """Appends a new bird dictionary to storage."""
     # Add metadata
     bird_data['id'] = str(uuid.uuid4())
     bird_data['status'] = 'field'
-    
-    birds = load_birds()
-    birds.append(bird_data)
-    
-    if save_all_birds(birds):
+    migrations.upgrade_record(bird_data)
+
+    if get_repository().add(bird_data):
         print(f"Bird saved: {bird_data}")
         return True
     return False
-    
+
 def update_bird_status(bird_id, new_status):
     """Updates the status of a specific bird."""
-    birds = load_birds()
-    found = False
-    for bird in birds:
-        if bird.get('id') == bird_id:
-            bird['status'] = new_status
-            found = True
-            break
-    
-    if found:
-        return save_all_birds(birds)
-    return False
+    return get_repository().update(bird_id, {'status': new_status})
 
 def delete_bird(bird_id):
-    """Permanently removes a bird."""
-    birds = load_birds()
-    # Filter out the bird
-    new_birds = [b for b in birds if b.get('id') != bird_id]
-    
-    if len(new_birds) < len(birds):
-        return save_all_birds(new_birds)
-    return False
+    """Permanently removes a bird, releasing its images and chat transcript."""
+    bird = get_repository().get(bird_id)
+    if bird is None or not get_repository().delete(bird_id):
+        return False
+    # The delete is only queued; removing the files before it is on disk
+    # would leave a bird without its image and chat after a crash
+    if not get_repository().flush():
+        print(f"Keeping files of bird {bird_id} until its deletion is saved")
+        return True
+
+    for key in ('image_path', 'cropped_path'):
+        try:
+            capture_store.release(bird.get(key))
+        except OSError as e:
+            print(f"Could not release image {bird.get(key)}: {e}")
+    try:
+        transcripts.delete_transcript(bird_id)
+    except OSError as e:
+        print(f"Could not remove chat transcript for {bird_id}: {e}")
+    return True
 
 def get_birds_by_status(status):
     """Returns filtered list of birds."""
-    return [b for b in load_birds() if b.get('status') == status]
+    return get_repository().by_status(status)
+
+def iter_birds(status=None, offset=0, limit=None, order_by=None):
+    """
+    Yields birds (optionally only those with a status) in pages, without
+    materialising the whole archive. order_by is one of 'timestamp',
+    'species' or 'name', prefixed with '-' for descending; None keeps
+    archive order.
+    """
+    return get_repository().iter_birds(status, offset, limit, order_by)
+
+def count_birds(status=None):
+    """Returns how many birds there are (with the given status)."""
+    return get_repository().count(status)
 
 def update_bird_data(bird_id, updates):
     """Updates arbitrary fields on a specific bird."""
-    birds = load_birds()
-    found = False
-    for bird in birds:
-        if bird.get('id') == bird_id:
-            bird.update(updates)
-            found = True
-            break
-    
-    if found:
-        return save_all_birds(birds)
-    return False
+    return get_repository().update(bird_id, updates)
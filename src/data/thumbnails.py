@@ -0,0 +1,102 @@
+"""
+Thumbnail pyramid for capture images.
+
+Each capture gets a few pre-scaled variants saved next to it as uncompressed
+BMPs, which decode far faster than the full-size PNG. The UI asks for a bird
+id and a target size; the smallest variant that covers it is scaled the last
+few pixels and kept in a small in-memory cache.
+"""
+import glob
+import os
+from collections import OrderedDict
+
+import pygame
+
+# Longest side, in pixels, of each generated variant
+THUMBNAIL_SIZES = (80, 160, 320)
+# Final (bird image, size) surfaces kept in memory
+MEMORY_CACHE_ENTRIES = 256
+
+_memory_cache = OrderedDict()  # (path, mtime, size) -> Surface
+
+
+def thumbnail_path(source_path, variant):
+    return f"{os.path.splitext(source_path)[0]}.thumb{variant}.bmp"
+
+
+def _is_fresh(thumb_path, source_mtime):
+    return os.path.exists(thumb_path) and os.path.getmtime(thumb_path) >= source_mtime
+
+
+def _generate(source_path):
+    """Writes every variant for a source image, replacing stale ones."""
+    source = pygame.image.load(source_path)
+    width, height = source.get_size()
+
+    for variant in THUMBNAIL_SIZES:
+        scale = min(1.0, variant / max(width, height))
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        thumb = pygame.transform.smoothscale(source.convert(24) if source.get_bitsize() < 24 else source, size)
+
+        path = thumbnail_path(source_path, variant)
+        tmp_path = path + '.tmp.bmp'
+        pygame.image.save(thumb, tmp_path)
+        os.replace(tmp_path, path)
+
+
+def _pick_variant(size):
+    """Smallest variant whose longest side covers the requested size."""
+    for variant in THUMBNAIL_SIZES:
+        if variant >= max(size):
+            return variant
+    return THUMBNAIL_SIZES[-1]
+
+
+def get_thumbnail_for_path(source_path, size):
+    """Returns source_path scaled to exactly size, via the thumbnail pyramid."""
+    source_mtime = os.path.getmtime(source_path)
+    key = (source_path, source_mtime, tuple(size))
+    if key in _memory_cache:
+        _memory_cache.move_to_end(key)
+        return _memory_cache[key]
+
+    variant = _pick_variant(size)
+    path = thumbnail_path(source_path, variant)
+    # Regenerate when missing or older than the source
+    if not _is_fresh(path, source_mtime):
+        _generate(source_path)
+
+    surface = pygame.transform.smoothscale(pygame.image.load(path), size)
+
+    _memory_cache[key] = surface
+    if len(_memory_cache) > MEMORY_CACHE_ENTRIES:
+        _memory_cache.popitem(last=False)
+    return surface
+
+
+def get_thumbnail(bird_id, size):
+    """
+    Returns the bird's crop (or full capture) scaled to size, or None if the
+    bird has no image on disk.
+    """
+    from src.data import capture_store
+    from src.data.storage import get_bird
+
+    bird = get_bird(bird_id)
+    if bird is None:
+        return None
+    image_path = bird.get('cropped_path') or bird.get('image_path')
+    if image_path:
+        # A fresh capture may still be being encoded
+        capture_store.ensure_written(image_path)
+    if not image_path or not os.path.exists(image_path):
+        return None
+    return get_thumbnail_for_path(image_path, size)
+
+
+def remove_thumbnails(source_path):
+    """Deletes every variant generated for a source image."""
+    for key in [k for k in _memory_cache if k[0] == source_path]:
+        del _memory_cache[key]
+    for path in glob.glob(glob.escape(os.path.splitext(source_path)[0]) + '.thumb*.bmp'):
+        os.remove(path)
@@ -0,0 +1,85 @@
+"""
+Per-bird chat transcripts.
+
+Each bird's conversation is kept out of the bird record, in its own
+append-only file of one compact JSON line per message ([sender, text]).
+Readers page backwards from the end of the file, so opening a chat only
+costs the last few messages however long the conversation has grown.
+"""
+import json
+import os
+
+TRANSCRIPTS_DIR = os.path.join('assets', 'chats')
+# Messages loaded when a chat opens, and per page when scrolling back
+RECENT_MESSAGES = 30
+READ_BLOCK = 4096
+
+
+def transcript_path(bird_id):
+    return os.path.join(TRANSCRIPTS_DIR, f"{bird_id}.jsonl")
+
+
+def append_message(bird_id, sender, text):
+    """Adds one message to the end of a bird's transcript."""
+    if not os.path.exists(TRANSCRIPTS_DIR):
+        os.makedirs(TRANSCRIPTS_DIR)
+
+    line = json.dumps([sender, text], separators=(',', ':')).encode('utf-8') + b'\n'
+    with open(transcript_path(bird_id), 'a+b') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            # A crash mid-write can leave a torn last line; don't glue onto it
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                line = b'\n' + line
+        f.write(line)
+
+
+def read_messages(bird_id, count=RECENT_MESSAGES, before=None):
+    """
+    Returns (messages, offset): up to `count` (sender, text) tuples ending
+    just before byte offset `before` (the end of the file when None), and
+    the offset of the first one returned. Pass that offset back as `before`
+    to fetch the page above; an offset of 0 means there is nothing older.
+    """
+    path = transcript_path(bird_id)
+    if not os.path.exists(path):
+        return [], 0
+
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END) if before is None else before
+        start = end
+        data = b''
+        # Read backwards until the block holds `count` whole lines
+        while start > 0 and data.count(b'\n') <= count:
+            step = min(READ_BLOCK, start)
+            start -= step
+            f.seek(start)
+            data = f.read(step) + data
+
+    lines = data.split(b'\n')
+    if start > 0:
+        # The first piece begins mid-line; it belongs to the page above
+        start += len(lines[0]) + 1
+        lines = lines[1:]
+
+    entries = []
+    position = start
+    for line in lines:
+        if line.strip():
+            try:
+                sender, text = json.loads(line)
+                entries.append((position, (sender, text)))
+            except ValueError:
+                print(f"Ignoring unreadable chat line in {path}")
+        position += len(line) + 1
+    entries = entries[-count:] if count else []
+
+    messages = [message for _position, message in entries]
+    return messages, (entries[0][0] if entries else start)
+
+
+def delete_transcript(bird_id):
+    path = transcript_path(bird_id)
+    if os.path.exists(path):
+        os.remove(path)
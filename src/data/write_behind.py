@@ -0,0 +1,127 @@
+"""
+Write-behind queue that moves storage writes off the pygame main thread.
+"""
+import threading
+import time
+
+# How long a mutation may sit in the queue, collecting follow-ups, before it is written
+WRITE_BEHIND_DELAY = 0.5
+
+
+def coalesce(pending, record):
+    """
+    Merges a new journal record into the one already queued for the same bird.
+    Returns None when the two cancel out (a bird added and deleted before
+    either was written).
+    """
+    if pending is None:
+        return record
+
+    op = record['op']
+    if op == 'delete':
+        return None if pending['op'] == 'add' else record
+    if op == 'update':
+        if pending['op'] == 'add':
+            bird = dict(pending['bird'])
+            bird.update(record['set'])
+            bird['id'] = pending['bird']['id']
+            return {'op': 'add', 'bird': bird}
+        if pending['op'] == 'update':
+            merged = dict(pending['set'])
+            merged.update(record['set'])
+            return {'op': 'update', 'id': record['id'], 'set': merged}
+    return record
+
+
+class WriteBehindQueue:
+    """
+    Collects records keyed by bird id and hands them to sink(records) on a
+    background thread once the oldest one has waited `delay` seconds.
+    Several mutations to the same bird inside that window become one record.
+    """
+
+    def __init__(self, sink, delay=WRITE_BEHIND_DELAY):
+        self._sink = sink
+        self._delay = delay
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()  # keeps batches in submission order
+        self._pending = {}  # key -> record, in first-submitted order
+        self._due = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='storage-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, key, record):
+        with self._cond:
+            merged = coalesce(self._pending.get(key), record)
+            if merged is None:
+                self._pending.pop(key, None)
+            else:
+                self._pending[key] = merged
+
+            if self._due is None:
+                self._due = time.monotonic() + self._delay
+            self._cond.notify()
+
+    def discard(self):
+        """Drops everything queued (used when the whole archive is replaced)."""
+        with self._cond:
+            self._pending = {}
+            self._due = None
+
+    def flush(self):
+        """
+        Writes everything queued right now, on the calling thread. Returns
+        False if the write failed (the records stay queued for a retry).
+        """
+        with self._write_lock:
+            with self._cond:
+                records = list(self._pending.items())
+                self._pending = {}
+                self._due = None
+            if records:
+                try:
+                    self._sink([record for _key, record in records])
+                except Exception as e:
+                    print(f"Error saving bird data: {e}")
+                    self._requeue(records)
+                    return False
+        return True
+
+    def _requeue(self, records):
+        """Puts a failed batch back in front of anything queued since, to be retried."""
+        with self._cond:
+            pending = {}
+            for key, record in records:
+                if key in self._pending:
+                    record = coalesce(record, self._pending.pop(key))
+                if record is not None:
+                    pending[key] = record
+            pending.update(self._pending)
+            self._pending = pending
+            if self._pending:
+                self._due = time.monotonic() + self._delay
+                self._cond.notify()
+
+    def close(self):
+        """Flushes and stops the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+
+                remaining = self._due - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+
+            self.flush()
@@ -3,6 +3,7 @@ import random
 import os
 from .spritesheetanim import SpriteStripAnim
 from src.data.events import get_random_event, EVENT_HAPPY, EVENT_SAD, EVENT_ANGRY
+from src.ai.label_policy import DEFAULT_SPRITE_FAMILY, sprite_family
 
 # States
 IDLE = 0
@@ -49,15 +50,10 @@ class Bird(pygame.sprite.Sprite):
         self.pick_new_target()
 
     def load_sprites(self):
-        # Determine species from bird_data
-        species = "owl" # default
-        if self.bird_data and 'species' in self.bird_data:
-            s_lower = self.bird_data['species'].lower()
-            if "pigeon" in s_lower or "dove" in s_lower:
-                species = "pigeon"
-            elif "sparrow" in s_lower:
-                species = "sparrow"
-            # else remains owl/default
+        # Sprite family is decided when the bird is identified and stored on the record
+        species = DEFAULT_SPRITE_FAMILY
+        if self.bird_data:
+            species = self.bird_data.get('sprite_family') or sprite_family(self.bird_data.get('species'))
         
         # Path relative to where main.py is run (project root)
         sprite_path_right = os.path.join("assets", "sprites", f"{species}_walk.png")
@@ -1,10 +1,18 @@
 from src.scenes.screen import Screen
+import math
 import pygame
 import pygame_gui
 from pygame_gui.elements import UIScrollingContainer, UIPanel, UIImage, UILabel, UIButton
-from src.data.storage import get_birds_by_status
+from src.data.storage import count_birds, iter_birds
+from src.data.thumbnails import get_thumbnail
 from src.ui.bird_info_card import BirdInfoCard
 
+# Grid Configuration
+TILE_SIZE = (200, 240)
+TILE_GAP = 20
+GRID_START = (10, 10)
+ROOST_ORDER = 'timestamp'
+
 class BirdchiveScreen(Screen):
     def __init__(self, screen_manager, manager, window_size):
         super().__init__(screen_manager, manager, window_size)
@@ -12,6 +20,11 @@ class BirdchiveScreen(Screen):
         self.scroll_container = None
         self.bird_buttons = {} # Map button -> bird_data
         self.grid_items = []
+        self.total_birds = 0
+        self.total_rows = 0
+        self.total_height = 0
+        self.columns = 1
+        self.visible_rows = None # (first, last) rows that currently have tiles
         self.active_card = None
         self.background = None
         self.logo_image = None
@@ -50,100 +63,119 @@ class BirdchiveScreen(Screen):
         self.refresh_list()
 
     def refresh_list(self):
+        """Re-sizes the grid for the current archive and rebuilds the visible tiles."""
+        self.total_birds = count_birds('archived')
+
+        container_width = self.scroll_container.get_relative_rect().width
+        # Calculate columns based on width
+        self.columns = max(1, (container_width - GRID_START[0]) // (TILE_SIZE[0] + TILE_GAP))
+
+        # Update scrolling area for every row, even though only visible ones get widgets
+        self.total_rows = math.ceil(self.total_birds / self.columns)
+        self.total_height = GRID_START[1] + (self.total_rows * (TILE_SIZE[1] + TILE_GAP))
+        self.scroll_container.set_scrollable_area_dimensions((container_width - 20, self.total_height))
+
+        self.visible_rows = None
+        self.show_visible_rows()
+
+    def _visible_row_range(self):
+        """Rows overlapping the viewport, plus one row of slack either side."""
+        row_height = TILE_SIZE[1] + TILE_GAP
+        view_height = self.scroll_container.get_relative_rect().height
+
+        scroll_top = 0
+        scroll_bar = self.scroll_container.vert_scroll_bar
+        if scroll_bar is not None:
+            scroll_top = scroll_bar.start_percentage * self.total_height
+
+        first = max(0, int((scroll_top - GRID_START[1]) // row_height) - 1)
+        last = min(self.total_rows, int((scroll_top + view_height) // row_height) + 2)
+        return first, last
+
+    def show_visible_rows(self):
+        """Builds tiles for just the rows in view, fetching only those birds."""
+        rows = self._visible_row_range()
+        if rows == self.visible_rows:
+            return
+        self.visible_rows = rows
+
         # Clear existing
         for item in self.grid_items:
             item.kill()
         self.grid_items = []
-            
         self.bird_buttons = {}
-            
-        birds = get_birds_by_status('archived')
-        
-        # Grid Configuration
-        tile_size = (200, 240)
-        gap = 20
-        start_x, start_y = 10, 10
-        
-        container_width = self.scroll_container.get_relative_rect().width
-        # Calculate columns based on width
-        cols = max(1, (container_width - start_x) // (tile_size[0] + gap))
-        
-        current_row = 0
-        current_col = 0
-        
-        for bird in birds:
-            x = start_x + (current_col * (tile_size[0] + gap))
-            y = start_y + (current_row * (tile_size[1] + gap))
-            
-            # 1. Tile Panel (Background)
-            tile_rect = pygame.Rect((x, y), tile_size)
-            panel = UIPanel(
-                relative_rect=tile_rect,
-                manager=self.manager,
-                container=self.scroll_container,
-                object_id='#bird_tile'
-            )
-            self.grid_items.append(panel)
-            
-            # 2. Image
-            img_h = 160
-            # Center horizontally with anchors
-            # rect.x=0 acts as offset from center when anchored
-            img_rect = pygame.Rect((0, 10), (tile_size[0]-30, img_h))
-            image_path = bird.get('cropped_path') or bird.get('image_path')
-            
-            # Check if image exists/loadable
-            try:
-                loaded_image = pygame.image.load(image_path)
-                loaded_image = pygame.transform.scale(loaded_image, (img_rect.width, img_rect.height))
-                UIImage(relative_rect=img_rect, image_surface=loaded_image, manager=self.manager, container=panel,
-                        anchors={'centerx': 'centerx', 'top': 'top'})
-            except:
-                UILabel(relative_rect=img_rect, text="No Image", manager=self.manager, container=panel,
-                        anchors={'centerx': 'centerx', 'top': 'top'})
-
-            # 3. Label (Name/Species)
-            name = bird.get('name')
-            species = bird.get('species', 'Unknown')
-            date_str = bird.get('timestamp', 'Unknown').split('T')[0]
-            
-            label_text = name if name else species
-            
-            UILabel(relative_rect=pygame.Rect((0, img_h + 15), (tile_size[0]-20, 25)), 
-                    text=label_text, 
-                    manager=self.manager, 
-                    container=panel,
-                    object_id='#tile_label_main',
+
+        first, last = rows
+        birds = iter_birds('archived', offset=first * self.columns,
+                           limit=(last - first) * self.columns, order_by=ROOST_ORDER)
+
+        for index, bird in enumerate(birds, start=first * self.columns):
+            row, col = divmod(index, self.columns)
+            x = GRID_START[0] + (col * (TILE_SIZE[0] + TILE_GAP))
+            y = GRID_START[1] + (row * (TILE_SIZE[1] + TILE_GAP))
+            self._build_tile(bird, (x, y))
+
+    def _build_tile(self, bird, position):
+        tile_size = TILE_SIZE
+
+        # 1. Tile Panel (Background)
+        tile_rect = pygame.Rect(position, tile_size)
+        panel = UIPanel(
+            relative_rect=tile_rect,
+            manager=self.manager,
+            container=self.scroll_container,
+            object_id='#bird_tile'
+        )
+        self.grid_items.append(panel)
+
+        # 2. Image
+        img_h = 160
+        # Center horizontally with anchors
+        # rect.x=0 acts as offset from center when anchored
+        img_rect = pygame.Rect((0, 10), (tile_size[0]-30, img_h))
+
+        # Check if image exists/loadable
+        try:
+            loaded_image = get_thumbnail(bird['id'], img_rect.size)
+            if loaded_image is None:
+                raise FileNotFoundError(bird['id'])
+            UIImage(relative_rect=img_rect, image_surface=loaded_image, manager=self.manager, container=panel,
                     anchors={'centerx': 'centerx', 'top': 'top'})
-            
-            UILabel(relative_rect=pygame.Rect((0, img_h + 40), (tile_size[0]-20, 20)), 
-                    text=date_str, 
-                    manager=self.manager, 
-                    container=panel,
-                    object_id='#tile_label_sub',
+        except:
+            UILabel(relative_rect=img_rect, text="No Image", manager=self.manager, container=panel,
                     anchors={'centerx': 'centerx', 'top': 'top'})
 
-            # 4. Invisible Button for Click
-            btn = UIButton(
-                relative_rect=pygame.Rect((0,0), tile_size),
-                text='',
+        # 3. Label (Name/Species)
+        name = bird['name']
+        species = bird.get('species', 'Unknown')
+        date_str = bird.get('timestamp', 'Unknown').split('T')[0]
+
+        label_text = name if name else species
+
+        UILabel(relative_rect=pygame.Rect((0, img_h + 15), (tile_size[0]-20, 25)),
+                text=label_text,
                 manager=self.manager,
                 container=panel,
-                parent_element=panel,
-                object_id='#tile_button' # Make this transparent in theme
-            )
-            self.bird_buttons[btn] = bird
-            
-            # Increment Grid
-            current_col += 1
-            if current_col >= cols:
-                current_col = 0
-                current_row += 1
-                
-        # Update scrolling area
-        total_rows = current_row + (1 if current_col > 0 else 0)
-        total_height = start_y + (total_rows * (tile_size[1] + gap))
-        self.scroll_container.set_scrollable_area_dimensions((container_width - 20, total_height))
+                object_id='#tile_label_main',
+                anchors={'centerx': 'centerx', 'top': 'top'})
+
+        UILabel(relative_rect=pygame.Rect((0, img_h + 40), (tile_size[0]-20, 20)),
+                text=date_str,
+                manager=self.manager,
+                container=panel,
+                object_id='#tile_label_sub',
+                anchors={'centerx': 'centerx', 'top': 'top'})
+
+        # 4. Invisible Button for Click
+        btn = UIButton(
+            relative_rect=pygame.Rect((0,0), tile_size),
+            text='',
+            manager=self.manager,
+            container=panel,
+            parent_element=panel,
+            object_id='#tile_button' # Make this transparent in theme
+        )
+        self.bird_buttons[btn] = bird
 
 
     def process_event(self, event):
@@ -170,7 +202,9 @@ class BirdchiveScreen(Screen):
                 self.active_card = BirdInfoCard(card_rect, self.manager, bird_data, on_close_callback=self.refresh_list)
 
     def update(self, time_delta):
-        pass
+        # Swap tiles in and out as the grid scrolls
+        if self.scroll_container:
+            self.show_visible_rows()
 
     def draw(self, surface):
         if self.background:
@@ -194,6 +228,7 @@ class BirdchiveScreen(Screen):
         if self.scroll_container:
             self.scroll_container.kill()
             self.scroll_container = None
+        self.grid_items = []
         self.bird_buttons = {}
 
     def resize(self, new_size):
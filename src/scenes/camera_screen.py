@@ -3,7 +3,14 @@ import pygame_gui
 import pygame.camera
 
 from src.scenes.screen import Screen
-from src.ai.image_processor import process_image
+from src.ai import preloader
+from src.ai.capture_worker import CAPTURE_PROCESSED, submit_capture
+from src.ai.live_detector import LiveDetector
+
+# CONFIGURATION
+# Detect birds on the live preview, draw their boxes and only allow a capture
+# when one is in frame (optional: runs YOLO continuously while the camera is open)
+LIVE_DETECTION = False
 
 class CameraScreen(Screen):
     def __init__(self, screen_manager, manager, window_size):
@@ -12,6 +19,8 @@ class CameraScreen(Screen):
         self.cam = None
         self.back_btn = None
         self.capture_btn = None
+        self.pending_capture = None  # Future for the photo being processed
+        self.live_detector = None
         
     def setup(self, **kwargs):
         # Initialize camera
@@ -53,24 +62,33 @@ class CameraScreen(Screen):
         )
         self.ui_elements.append(self.capture_btn)
 
+        if LIVE_DETECTION and self.cam:
+            self.live_detector = LiveDetector()
+            self.live_detector.start()
+
     def process_event(self, event):
         if event.type == pygame_gui.UI_BUTTON_PRESSED:
             if event.ui_element == self.back_btn:
                 self.screen_manager.switch_to('field')
             elif event.ui_element == self.capture_btn:
-                if self.cam:
+                if self.cam and self.pending_capture is None:
                     try:
                         image = self.cam.get_image()
-                        bird_data = process_image(image)
-                        
-                        if bird_data:
-                            print("Image Captured and Saved! Switching to Field...")
-                            self.screen_manager.switch_to('field', new_capture=bird_data)
-                        else:
-                            print("Failed to save image.")
+                        # Processed on the capture worker; CAPTURE_PROCESSED arrives when done
+                        self.pending_capture = submit_capture(image)
+                        self.capture_btn.disable()
                     except Exception as e:
                         print(f"Capture failed: {e}")
 
+        elif event.type == CAPTURE_PROCESSED and event.job is self.pending_capture:
+            self.pending_capture = None
+            self.capture_btn.enable()
+            if event.birds:
+                print(f"Image Captured and {len(event.birds)} bird(s) Saved! Switching to Field...")
+                self.screen_manager.switch_to('field', new_capture=event.birds[0])
+            else:
+                print("Failed to save image.")
+
     def draw(self, surface):
         # Draw camera feed
         if self.cam:
@@ -79,7 +97,12 @@ class CameraScreen(Screen):
                 img_w, img_h = image.get_size()
                 scale = max(self.window_size[0] / img_w, self.window_size[1] / img_h)
                 scaled_image = pygame.transform.scale(image, (int(img_w * scale), int(img_h * scale)))
-                surface.blit(scaled_image, scaled_image.get_rect(center=(self.window_size[0] // 2, self.window_size[1] // 2)))
+                preview_rect = scaled_image.get_rect(center=(self.window_size[0] // 2, self.window_size[1] // 2))
+                surface.blit(scaled_image, preview_rect)
+
+                if self.live_detector and self.pending_capture is None:
+                    self.live_detector.submit(image)
+                    self.draw_detections(surface, preview_rect)
             except Exception as e:
                  # Draw placeholder if error
                 surface.fill((50, 50, 50))
@@ -91,12 +114,62 @@ class CameraScreen(Screen):
             text_rect = text.get_rect(center=(self.window_size[0]//2, self.window_size[1]//2))
             surface.blit(text, text_rect)
 
+        if self.pending_capture is not None:
+            self.draw_processing(surface)
+        elif preloader.is_loading('detector') or preloader.is_loading('classifier'):
+            self.draw_warming_up(surface)
+
+    def draw_detections(self, surface, preview_rect):
+        """Outlines the birds the live detector last found, mapped onto the preview."""
+        if not self.live_detector.bird_in_frame():
+            return
+        for x1, y1, x2, y2, _confidence in self.live_detector.boxes:
+            box = pygame.Rect(preview_rect.x + x1 * preview_rect.width, preview_rect.y + y1 * preview_rect.height,
+                              (x2 - x1) * preview_rect.width, (y2 - y1) * preview_rect.height)
+            pygame.draw.rect(surface, (255, 220, 60), box, 3, border_radius=6)
+
+    def draw_processing(self, surface):
+        """Dims the preview and shows that a capture is being identified."""
+        overlay = pygame.Surface(self.window_size, pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 100))
+        surface.blit(overlay, (0, 0))
+
+        font = pygame.font.Font(None, 48)
+        text = font.render("Processing...", True, (255, 255, 255))
+        text_rect = text.get_rect(center=(self.window_size[0]//2, self.window_size[1]//2))
+        surface.blit(text, text_rect)
+
+    def draw_warming_up(self, surface):
+        """Notes that captures will be slow until the models have loaded."""
+        font = pygame.font.Font(None, 32)
+        text = font.render("Bird identifier warming up...", True, (255, 255, 255))
+        background = pygame.Surface((text.get_width() + 20, text.get_height() + 12), pygame.SRCALPHA)
+        background.fill((0, 0, 0, 140))
+        rect = background.get_rect(midtop=(self.window_size[0]//2, 30))
+        surface.blit(background, rect)
+        surface.blit(text, text.get_rect(center=rect.center))
+
     def update(self, time_delta):
-        pass  # Camera updates happen in draw via get_image
+        # Camera frames are read in draw via get_image
+        if self.live_detector is None or self.pending_capture is not None:
+            return
+
+        # Only worth running the full pipeline with a bird in frame (unless
+        # live detection itself has stopped working)
+        can_capture = not self.live_detector.available or self.live_detector.bird_in_frame()
+        if can_capture and not self.capture_btn.is_enabled:
+            self.capture_btn.enable()
+        elif not can_capture and self.capture_btn.is_enabled:
+            self.capture_btn.disable()
        
     def cleanup(self):
         if self.cam:
             self.cam.stop()
+        # A capture still in flight finishes on its own and lands in the field
+        self.pending_capture = None
+        if self.live_detector:
+            self.live_detector.stop()
+            self.live_detector = None
         
         for element in self.ui_elements:
             element.kill()
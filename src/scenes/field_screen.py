@@ -4,6 +4,7 @@ import pygame_gui
 import random
 from src.entities.bird import Bird
 from src.data.storage import load_birds, get_birds_by_status
+from src.ai.capture_worker import CAPTURE_PROCESSED
 from src.data.events import EVENT_HAPPY, EVENT_SAD, EVENT_ANGRY
 from src.ui.bird_info_card import BirdInfoCard
 from src.ui.tweeter_card import TweeterCard
@@ -251,6 +252,11 @@ class FieldScreen(Screen):
         if self.popup_container:
            pass # RagePopup handles its own events now
 
+        # A capture that finished after leaving the camera screen
+        if event.type == CAPTURE_PROCESSED and event.birds:
+            self.refresh_birds()
+            return
+
         # 1. UI Buttons (Navigation) - DISABLE if Popup Active or Rage Delay
         if event.type == pygame_gui.UI_BUTTON_PRESSED:
             if not self.popup_container and not self.rage_delay_active: # Only allow if no popup/delay
@@ -1,7 +1,8 @@
 import pygame
 import pygame_gui
 from pygame_gui.elements import UIWindow, UIButton, UILabel, UIImage, UITextEntryLine
-from src.data.storage import update_bird_status, save_all_birds, load_birds, delete_bird
+from src.data.storage import update_bird_status, update_bird_data, delete_bird
+from src.data.thumbnails import get_thumbnail
 
 class BirdInfoCard(UIWindow):
     def __init__(self, rect, manager, bird_data, on_close_callback=None, on_tweeter_callback=None):
@@ -38,7 +39,7 @@ class BirdInfoCard(UIWindow):
             container=self,
             object_id='#name_header_entry'
         )
-        self.name_entry.set_text(self.bird_data.get('name', ''))
+        self.name_entry.set_text(self.bird_data['name'] or '')
         
         # 2. MIDDLE SECTION (Image + Info)
         start_x_middle = 50
@@ -52,8 +53,7 @@ class BirdInfoCard(UIWindow):
         
         if image_path:
              try:
-                loaded_image = pygame.image.load(image_path).convert_alpha()
-                loaded_image = pygame.transform.scale(loaded_image, (img_size, img_size))
+                loaded_image = get_thumbnail(bird_data['id'], (img_size, img_size)).convert_alpha()
                 
                 # Round the image (Rounded Rectangle)
                 mask = pygame.Surface((img_size, img_size), pygame.SRCALPHA)
@@ -78,7 +78,7 @@ class BirdInfoCard(UIWindow):
         UILabel(relative_rect=pygame.Rect((col_x, y_middle + 20), (width, 25)), text=species, manager=manager, container=self)
         
         # Personality / Trait Label
-        personality = self.bird_data.get('personality', 'Unknown')
+        personality = self.bird_data['personality'] or 'Unknown'
         UILabel(relative_rect=pygame.Rect((col_x, y_middle + 55), (width, 20)), text="Personality:", manager=manager, container=self, object_id='#info_header')
         self.personality_label = UILabel(relative_rect=pygame.Rect((col_x, y_middle + 75), (width, 25)), text=f"{personality}", manager=manager, container=self)
 
@@ -156,21 +156,12 @@ class BirdInfoCard(UIWindow):
         if self.name_entry:
             new_name = self.name_entry.get_text()
             if new_name: # Only save if not empty
-                 if new_name != self.bird_data.get('name'):
+                 if new_name != self.bird_data['name']:
                     # Save name locally
                     self.bird_data['name'] = new_name
                     
                     # Update storage
-                    birds = load_birds()
-                    found = False
-                    for b in birds:
-                        if b['id'] == self.bird_data['id']:
-                            b['name'] = new_name
-                            found = True
-                            break
-                    
-                    if found:
-                        save_all_birds(birds)
+                    if update_bird_data(self.bird_data['id'], {'name': new_name}):
                         print(f"Saved name '{new_name}' for bird {self.bird_data['id']}")
             
             # No mode switch needed
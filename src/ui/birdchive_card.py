@@ -2,6 +2,7 @@ import pygame
 import pygame_gui
 from pygame_gui.elements import UIWindow, UIButton, UILabel, UIImage
 from src.data.storage import update_bird_status, delete_bird
+from src.data.thumbnails import get_thumbnail
 
 class BirdchiveCard(UIWindow):
     def __init__(self, rect, manager, bird_data, on_close_callback=None):
@@ -15,7 +16,9 @@ class BirdchiveCard(UIWindow):
         image_path = bird_data.get('cropped_path') or bird_data.get('image_path')
         if image_path:
              try:
-                loaded_image = pygame.image.load(image_path)
+                loaded_image = get_thumbnail(bird_data['id'], img_rect.size)
+                if loaded_image is None:
+                    raise FileNotFoundError(image_path)
                 self.bird_image_view = UIImage(relative_rect=img_rect, image_surface=loaded_image, manager=manager, container=self)
              except:
                  pass
@@ -4,12 +4,21 @@ import random
 from pygame_gui.elements import UIWindow, UIButton, UITextBox, UITextEntryLine
 from src.api.backboard_client import BackboardClient, USE_BACKBOARD_API
 from src.data.storage import update_bird_data
-from src.ai.sentiment import analyze_text
+from src.data.transcripts import append_message, read_messages
+from src.ai import preloader
+from src.ai.sentiment import get_analysis_service
+
+# Add 'Annoying' to detect rage-inducing content, but exclude it from personality storage
+TRAITS = ['Intelligent', 'Curious', 'Brave', 'Lazy', 'Friendly', 'Calm', 'Annoying']
+# Weight of each new message in a chat's running trait scores
+MESSAGE_WEIGHT = 0.3
+
+_trait_sessions = {}  # bird id -> TraitSession
 
 class TweeterCard(UIWindow):
     def __init__(self, rect, manager, bird_data=None, on_close_callback=None, event_data=None):
         species = bird_data.get('species', 'Bird') if bird_data else 'Bird'
-        name = bird_data.get('name', '') if bird_data else ''
+        name = bird_data['name'] if bird_data else None
         
         display_name = name if name else species
 
@@ -18,6 +27,11 @@ class TweeterCard(UIWindow):
             title = f"{display_name} is feeling {event_data['type']}!"
             
         super().__init__(rect, manager, title, draggable=False, object_id='#tweeter_card')
+        self.chat_title = title
+        # Show while the trait model is still loading; cleared in update()
+        self.warming_up = preloader.is_loading('sentiment')
+        if self.warming_up:
+            self.set_display_title(f"{title} (AI warming up...)")
         self.bird_data = bird_data
         self.on_close_callback = on_close_callback
         self.species = species # Keep raw species for reference if needed
@@ -31,15 +45,19 @@ class TweeterCard(UIWindow):
         self.waiting_for_response = False
         self.pending_response = None
         
-        # Chat history (list of tuples: (sender, message))
+        # Chat history (list of tuples: (sender, message)), starting with the
+        # most recent saved messages; older ones page in on scroll-up
         self.chat_history = []
+        self._history_offset = 0
+        if bird_data:
+            self.chat_history, self._history_offset = read_messages(bird_data['id'])
         
         if event_data:
              # Event specific greeting
-             self.chat_history.append(("bird", event_data['initial_message']))
+             self._add_message("bird", event_data['initial_message'])
         else:
              # Load previous personality or generate greeting
-             personality = bird_data.get('personality', '') if bird_data else ''
+             personality = bird_data['personality'] if bird_data else None
              if personality:
                  self.chat_history.append(("bird", f"*chirp* Welcome back!"))
              else:
@@ -53,6 +71,8 @@ class TweeterCard(UIWindow):
             container=self,
             object_id='#chat_display'
         )
+        if self.chat_display.scroll_bar:
+            self.chat_display.scroll_bar.set_scroll_from_start_percentage(1.0)
         
         # Text Input
         self.input_line = UITextEntryLine(
@@ -104,6 +124,30 @@ class TweeterCard(UIWindow):
                 lines.append(f"<b>{self.display_name}:</b> {message}")
         return "<br><br>".join(lines)
 
+    def _add_message(self, sender, message):
+        """Append a message to the history and the bird's saved transcript."""
+        self.chat_history.append((sender, message))
+        if self.bird_data:
+            try:
+                append_message(self.bird_data['id'], sender, message)
+            except OSError as e:
+                print(f"Error saving chat message: {e}")
+
+    def _load_older_messages(self):
+        """Prepend the previous page of the transcript, keeping the view in place."""
+        older, self._history_offset = read_messages(self.bird_data['id'], before=self._history_offset)
+        if not older:
+            self._history_offset = 0
+            return
+
+        self.chat_history[:0] = older
+        self.chat_display.html_text = self._format_chat_html()
+        self.chat_display.rebuild()
+
+        # Keep the message that was at the top roughly where it was
+        if self.chat_display.scroll_bar:
+            self.chat_display.scroll_bar.set_scroll_from_start_percentage(len(older) / len(self.chat_history))
+
     def _get_canned_response(self, user_message):
         """Return a canned placeholder response from the bird."""
         responses = [
@@ -138,7 +182,10 @@ class TweeterCard(UIWindow):
             return
             
         # Add user message to history and display immediately
-        self.chat_history.append(("user", user_text))
+        self._add_message("user", user_text)
+        if self.bird_data:
+            # Scored in the background now, so closing the card has nothing left to analyze
+            trait_session(self.bird_data).submit(user_text)
         self.chat_display.html_text = self._format_chat_html()
         self.chat_display.rebuild()
         
@@ -158,10 +205,19 @@ class TweeterCard(UIWindow):
         thread.start()
 
     def update(self, time_delta):
-        """Check for pending responses."""
+        """Check for pending responses and page in older messages at the top."""
+        if self.warming_up and not preloader.is_loading('sentiment'):
+            self.warming_up = False
+            self.set_display_title(self.chat_title)
+
+        # Also keep paging while the loaded messages don't fill the box yet
+        scroll_bar = self.chat_display.scroll_bar
+        if self._history_offset > 0 and (scroll_bar is None or scroll_bar.start_percentage <= 0):
+            self._load_older_messages()
+
         if self.waiting_for_response and self.pending_response is not None:
             # Response received
-            self.chat_history.append(("bird", self.pending_response))
+            self._add_message("bird", self.pending_response)
             self.chat_display.html_text = self._format_chat_html()
             self.chat_display.rebuild()
             
@@ -212,55 +268,109 @@ class TweeterCard(UIWindow):
             self.on_close_callback()
 
     def analyze_conversation_and_update_trait(self):
-        # Collect user messages
-        user_text = " ".join([msg for sender, msg in self.chat_history if sender == "user"])
-        if not user_text: return
-        
-        print(f"Analyzing traits for: {user_text[:50]}...")
-        
-        # Add 'Annoying' to detect rage-inducing content, but exclude it from personality storage
-        traits = ['Intelligent', 'Curious', 'Brave', 'Lazy', 'Friendly', 'Calm', 'Annoying']
-        new_scores = analyze_text(user_text, candidate_labels=traits)
-        if not new_scores: return
+        # Messages were scored as they were sent; commit the running aggregate
+        trait_session(self.bird_data).close()
 
-        # Process Rage (Annoying)
-        from src.data.game_state import GlobalState
-        annoyance_score = new_scores.pop('Annoying', 0.0)
 
-        print(f"Annoying score: {annoyance_score}")
-        
-        if annoyance_score > 0.4: # Threshold
-             # Add to rage meter (Scale 0-100). E.g. 0.8 score adds 16 rage.
-             rage_add = annoyance_score * 20 
-             GlobalState.get_instance().add_rage(rage_add)
-             print(f"Rage Increased by {rage_add:.1f}! Current: {GlobalState.get_instance().rage_level:.1f}")
-        
-        # Load existing scores
-        current_scores = self.bird_data.get('trait_scores', {})
-        
-        # Merge/Init (alpha blending)
-        updated_scores = {}
-        alpha = 0.5 # 50% update rate
-        
-        # Ensure we only iterate over the PERMANENT traits (excluding Annoying which was popped)
-        permanent_traits = [t for t in traits if t != 'Annoying']
-        
-        for trait in permanent_traits:
-            old = current_scores.get(trait, 0.0)
-            new = new_scores.get(trait, 0.0)
-            updated_scores[trait] = old * (1 - alpha) + new * alpha
-            
-        # Determine dominant trait
-        dominant_trait = max(updated_scores, key=updated_scores.get)
-        
-        print(f"Updated Composite Traits: {updated_scores}")
-        print(f"New Personality: {dominant_trait}")
-        
-        self.bird_data['trait_scores'] = updated_scores
-        self.bird_data['personality'] = dominant_trait
-        
-        # Clear legacy emotions
-        if 'emotion_scores' in self.bird_data:
-            del self.bird_data['emotion_scores']
-            
-        update_bird_data(self.bird_data['id'], self.bird_data)
+class TraitSession:
+    """
+    Running trait scores for one bird's chat. Each user message is queued for
+    analysis as it is sent and folded into an exponentially weighted average
+    when its scores come back; close() commits the average to the bird (or,
+    if some messages are still being scored, as soon as the last one is).
+    """
+
+    def __init__(self, bird_data):
+        self.bird_data = bird_data
+        self.scores = {}
+        self.pending = 0
+        self.closed = False
+
+    def submit(self, text):
+        self.closed = False
+        self.pending += 1
+        get_analysis_service().submit(text, candidate_labels=TRAITS, bird_id=self.bird_data['id'])
+
+    def add(self, scores):
+        self.pending = max(0, self.pending - 1)
+        if scores:
+            if not self.scores:
+                self.scores = dict(scores)
+            else:
+                for trait, score in scores.items():
+                    old = self.scores.get(trait, score)
+                    self.scores[trait] = old * (1 - MESSAGE_WEIGHT) + score * MESSAGE_WEIGHT
+        if self.closed and not self.pending:
+            self._commit()
+
+    def close(self):
+        self.closed = True
+        if not self.pending:
+            self._commit()
+
+    def _commit(self):
+        _trait_sessions.pop(self.bird_data['id'], None)
+        if self.scores:
+            apply_trait_analysis(self.bird_data, self.scores)
+
+
+def trait_session(bird_data):
+    """The bird's running trait session, started on its first message."""
+    session = _trait_sessions.get(bird_data['id'])
+    if session is None:
+        session = _trait_sessions[bird_data['id']] = TraitSession(bird_data)
+    return session
+
+
+def handle_trait_analysis(event):
+    """Routes a TRAIT_ANALYZED event to the session of the bird it was for."""
+    session = _trait_sessions.get(getattr(event, 'bird_id', None))
+    if session is not None:
+        session.add(event.scores)
+
+
+def apply_trait_analysis(bird_data, new_scores):
+    """Folds a finished trait analysis into the bird's traits and the rage meter."""
+    new_scores = dict(new_scores)
+
+    # Process Rage (Annoying)
+    from src.data.game_state import GlobalState
+    annoyance_score = new_scores.pop('Annoying', 0.0)
+
+    print(f"Annoying score: {annoyance_score}")
+    
+    if annoyance_score > 0.4: # Threshold
+         # Add to rage meter (Scale 0-100). E.g. 0.8 score adds 16 rage.
+         rage_add = annoyance_score * 20 
+         GlobalState.get_instance().add_rage(rage_add)
+         print(f"Rage Increased by {rage_add:.1f}! Current: {GlobalState.get_instance().rage_level:.1f}")
+    
+    # Load existing scores
+    current_scores = bird_data['trait_scores']
+    
+    # Merge/Init (alpha blending)
+    updated_scores = {}
+    alpha = 0.5 # 50% update rate
+    
+    # Ensure we only iterate over the PERMANENT traits (excluding Annoying which was popped)
+    permanent_traits = [t for t in TRAITS if t != 'Annoying']
+    
+    for trait in permanent_traits:
+        old = current_scores.get(trait, 0.0)
+        new = new_scores.get(trait, 0.0)
+        updated_scores[trait] = old * (1 - alpha) + new * alpha
+        
+    # Determine dominant trait
+    dominant_trait = max(updated_scores, key=updated_scores.get)
+    
+    print(f"Updated Composite Traits: {updated_scores}")
+    print(f"New Personality: {dominant_trait}")
+    
+    # Same dict the field sprite holds, so it sees the new personality too
+    bird_data['trait_scores'] = updated_scores
+    bird_data['personality'] = dominant_trait
+
+    update_bird_data(bird_data['id'], {
+        'trait_scores': updated_scores,
+        'personality': dominant_trait
+    })
@@ -0,0 +1,183 @@
+"""
+Storage benchmark: times every public function in src/data/storage.py
+against synthetic archives of increasing size and records peak memory.
+
+Not collected by pytest. Run from the project root:
+
+    python tests/benchmark_storage.py
+    python tests/benchmark_storage.py --sizes 1000 10000 --backends json --output bench.json
+
+Results are written as JSON so runs from different commits can be diffed.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data import migrations, storage
+from src.data.journal import atomic_write_json
+
+SPECIES = ["Rock Pigeon", "House Sparrow", "Barn Owl", "Mourning Dove", "Blue Jay", "American Robin"]
+TRAITS = ['Intelligent', 'Curious', 'Brave', 'Lazy', 'Friendly', 'Calm']
+
+
+def synthetic_bird(i, rng):
+    """A record shaped like the ones process_image and the UI produce."""
+    digest = uuid.UUID(int=rng.getrandbits(128)).hex
+    bird = {
+        'id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'status': 'field' if rng.random() < 0.3 else 'archived',
+        'image_path': f"assets/captures/objects/{digest[:2]}/{digest[2:4]}/{digest}.png",
+        'cropped_path': f"assets/captures/objects/{digest[2:4]}/{digest[:2]}/{digest}.png",
+        'timestamp': (datetime.datetime(2026, 1, 1) + datetime.timedelta(minutes=i)).isoformat(),
+        'species': rng.choice(SPECIES),
+        'name': f"Bird {i}" if rng.random() < 0.5 else None,
+        'personality': rng.choice(TRAITS),
+        'trait_scores': {trait: rng.random() for trait in TRAITS},
+        'backboard_assistant_id': None,
+        'backboard_thread_id': None,
+    }
+    return migrations.upgrade_record(bird)
+
+
+def build_archive(directory, backend, size, seed=0):
+    """Points storage at a fresh archive of `size` birds. Returns their ids."""
+    rng = random.Random(seed)
+    birds = [synthetic_bird(i, rng) for i in range(size)]
+
+    storage.close_repository()
+    storage.STORAGE_BACKEND = backend
+    storage.DATA_FILE = os.path.join(directory, 'saved_birds.json')
+    storage.SQLITE_FILE = os.path.join(directory, 'saved_birds.db')
+
+    if backend == 'sqlite':
+        storage.save_all_birds(birds)
+    else:
+        atomic_write_json(storage.DATA_FILE, {'schema_version': migrations.SCHEMA_VERSION, 'birds': birds})
+    storage.close_repository()
+    return [b['id'] for b in birds]
+
+
+def measure(fn, repeats):
+    """Runs fn(i) `repeats` times; returns latencies in ms and the peak traced memory of one extra call."""
+    latencies = []
+    # Storage prints every saved bird; keep that out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(repeats):
+            start = time.perf_counter()
+            fn(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        fn(repeats)
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return latencies, peak
+
+
+def operations(ids, repeats):
+    """(name, fn(i), repeats) for every public storage function."""
+    rng = random.Random(1)
+    picks = [rng.choice(ids) for _ in range(repeats + 1)]
+    # Distinct victims so every delete hits a live bird
+    victims = rng.sample(ids, min(len(ids), repeats + 1))
+
+    def cold_load(i):
+        storage.close_repository()
+        storage.load_birds()
+
+    load_repeats = max(1, min(repeats, 5))
+    return [
+        ('load_birds (cold)', cold_load, load_repeats),
+        ('load_birds', lambda i: storage.load_birds(), load_repeats),
+        ('get_bird', lambda i: storage.get_bird(picks[i]), repeats),
+        ('get_birds_by_status', lambda i: storage.get_birds_by_status('archived'), load_repeats),
+        ('count_birds', lambda i: storage.count_birds('archived'), repeats),
+        ('iter_birds (page of 40)', lambda i: list(storage.iter_birds(
+            'archived', offset=i * 40, limit=40, order_by='timestamp')), repeats),
+        ('update_bird_status', lambda i: storage.update_bird_status(
+            picks[i], 'field' if i % 2 else 'archived'), repeats),
+        ('update_bird_data', lambda i: storage.update_bird_data(
+            picks[i], {'name': f"Renamed {i}", 'trait_scores': {'Calm': 0.5}}), repeats),
+        ('delete_bird', lambda i: storage.delete_bird(victims[i % len(victims)]), min(repeats, len(victims) - 1)),
+        ('save_bird', lambda i: storage.save_bird({'species': "Barn Owl", 'timestamp': "2026-06-01T00:00:00"}), repeats),
+        ('flush', lambda i: storage.flush(), load_repeats),
+    ]
+
+
+def run(sizes, backends, repeats):
+    results = []
+    for backend in backends:
+        for size in sizes:
+            directory = tempfile.mkdtemp(prefix='bird_bench_')
+            try:
+                start = time.perf_counter()
+                ids = build_archive(directory, backend, size)
+                print(f"\n[{backend}] {size} birds (generated in {time.perf_counter() - start:.1f}s)")
+
+                for name, fn, count in operations(ids, repeats):
+                    latencies, peak = measure(fn, count)
+                    result = {
+                        'backend': backend,
+                        'size': size,
+                        'operation': name,
+                        'repeats': count,
+                        'mean_ms': statistics.mean(latencies),
+                        'p50_ms': statistics.median(latencies),
+                        'max_ms': max(latencies),
+                        'peak_kib': peak / 1024,
+                    }
+                    results.append(result)
+                    print(f"  {name:<26} mean {result['mean_ms']:9.3f} ms   p50 {result['p50_ms']:9.3f} ms"
+                          f"   max {result['max_ms']:9.3f} ms   peak {result['peak_kib']:10.1f} KiB")
+            finally:
+                storage.close_repository()
+                shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark src/data/storage.py at several archive sizes.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--backends', nargs='+', default=['json', 'sqlite'], choices=['json', 'sqlite'])
+    parser.add_argument('--repeats', type=int, default=50, help="calls per per-bird operation")
+    parser.add_argument('--output', default='storage_benchmark.json')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.backends, args.repeats)
+
+    report = {
+        'commit': current_commit(),
+        'created': datetime.datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Trait scoring benchmark: runs the zero-shot NLI engine and the embedding
+engine in src/ai/sentiment.py over the same conversations and compares
+their latency and how often they agree on the dominant trait. A final
+tiered pass reports how many lines the lexicon fast path answers and how
+well its guesses agree with the NLI model at several confidence thresholds.
+
+Not collected by pytest. Needs the models (downloaded on first run). Run from
+the project root:
+
+    python tests/benchmark_traits.py
+    python tests/benchmark_traits.py --batch-sizes 1 8 --output traits.json
+
+Results are written as JSON so runs from different commits can be diffed.
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai import sentiment, trait_lexicon
+
+TRAITS = ['Intelligent', 'Curious', 'Brave', 'Lazy', 'Friendly', 'Calm', 'Annoying']
+
+CONVERSATIONS = [
+    "what do you think about the theory of relativity? I was reading about time dilation",
+    "why is the sky blue? and where do you go at night? what's over that hill?",
+    "let's fly right into the storm, nothing scares us!",
+    "ugh I don't want to do anything today, just lying on the couch",
+    "hi friend!! you're the best bird, I love chatting with you",
+    "take a deep breath, everything is fine, the pond is so still this morning",
+    "SQUAWK SQUAWK answer me answer me answer me now!!!",
+    "can you solve this puzzle? 2, 3, 5, 7, 11... what comes next",
+    "I wonder what the other birds are building in that tree",
+    "I'll chase the hawk away myself if I have to",
+    "nap time again? we only just woke up from the last one",
+    "thanks for listening, you always cheer me up",
+    "you're so dumb, stupid bird, stop talking",
+    "the rain sounds nice on the roof, no rush to go anywhere",
+    "tell me everything about how migration works, how do you know where to go?",
+    "hello",
+    "you're cute",
+    "shut up",
+    "I don't hate you",
+    "cute sweet bird, thanks",
+]
+
+
+def time_engine(engine, batch_size):
+    """Scores every conversation in batches; returns (per-batch latencies in ms, results)."""
+    items = [(text, TRAITS) for text in CONVERSATIONS]
+    latencies, results = [], []
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        began = time.perf_counter()
+        results.extend(sentiment.analyze_texts(batch, engine=engine, fast_path=False))
+        latencies.append((time.perf_counter() - began) * 1000)
+    return latencies, results
+
+
+def agreement(reference, candidate):
+    """Share of conversations with the same dominant trait, and the mean absolute score difference."""
+    same, diffs = 0, []
+    for ref, cand in zip(reference, candidate):
+        if max(ref, key=ref.get) == max(cand, key=cand.get):
+            same += 1
+        diffs.extend(abs(ref[trait] - cand[trait]) for trait in TRAITS)
+    return same / len(reference), statistics.mean(diffs)
+
+
+def run(batch_sizes, repeats):
+    results = []
+    outputs = {}
+    for engine in ['nli', 'embedding']:
+        # First call loads (and for the embedding engine, encodes the labels)
+        began = time.perf_counter()
+        sentiment.analyze_texts([(CONVERSATIONS[0], TRAITS)], engine=engine, fast_path=False)
+        load_ms = (time.perf_counter() - began) * 1000
+        print(f"\n[{engine}] loaded in {load_ms:.0f} ms")
+
+        for batch_size in batch_sizes:
+            latencies = []
+            for _ in range(repeats):
+                batch_latencies, outputs[engine] = time_engine(engine, batch_size)
+                latencies.extend(batch_latencies)
+            per_text = [latency / batch_size for latency in latencies]
+            result = {
+                'engine': engine,
+                'batch_size': batch_size,
+                'load_ms': load_ms,
+                'mean_ms_per_text': statistics.mean(per_text),
+                'p50_ms_per_text': statistics.median(per_text),
+                'max_ms_per_batch': max(latencies),
+            }
+            results.append(result)
+            print(f"  batch {batch_size:<4} mean {result['mean_ms_per_text']:9.2f} ms/text"
+                  f"   p50 {result['p50_ms_per_text']:9.2f} ms/text   max {result['max_ms_per_batch']:9.2f} ms/batch")
+
+    top1, mean_diff = agreement(outputs['nli'], outputs['embedding'])
+    print(f"\nDominant trait agreement: {top1:.0%}   mean score difference {mean_diff:.3f}")
+    for text, ref, cand in zip(CONVERSATIONS, outputs['nli'], outputs['embedding']):
+        print(f"  {max(ref, key=ref.get):<12} {max(cand, key=cand.get):<12} {text[:50]}")
+    return results, {'top1_agreement': top1, 'mean_abs_score_diff': mean_diff}
+
+
+def run_tiered(thresholds):
+    """Lexicon fast path in front of NLI, with every lexicon answer double-checked."""
+    sentiment.reset_tier_stats()
+    sentiment.SHADOW_SAMPLE_RATE = 1.0
+    for text in CONVERSATIONS:
+        sentiment.analyze_texts([(text, TRAITS)], engine='nli')
+
+    stats = sentiment.tier_stats()
+    print("\n[tiered]")
+    for tier in ('lexicon', 'model'):
+        print(f"  {tier:<8} answered {stats[tier]['answered']:4d}   hit rate {stats[tier]['hit_rate']:5.0%}"
+              f"   mean {stats[tier]['mean_ms']:9.3f} ms/text")
+    stats['threshold_agreement'] = {}
+    for threshold in thresholds:
+        rate = sentiment.shadow_agreement(threshold)
+        stats['threshold_agreement'][str(threshold)] = rate
+        current = "  (current)" if threshold == trait_lexicon.CONFIDENCE_THRESHOLD else ""
+        shown = "n/a" if rate is None else f"{rate:.0%}"
+        print(f"  lexicon confidence >= {threshold:.2f}: agrees with NLI {shown}{current}")
+    return stats
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the NLI and embedding trait engines.")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--repeats', type=int, default=3, help="passes over the conversations per batch size")
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[0.6, 0.7, 0.75, 0.8, 0.9],
+                        help="lexicon confidence thresholds to report agreement for (one hit in a "
+                             "one-word line scores about 0.79, two hits about 0.93)")
+    parser.add_argument('--output', default='traits_benchmark.json')
+    args = parser.parse_args()
+
+    results, agreement_stats = run(args.batch_sizes, args.repeats)
+    tiers = run_tiered(args.thresholds)
+
+    report = {
+        'commit': current_commit(),
+        'created': datetime.datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'agreement': agreement_stats,
+        'tiers': tiers,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import sys
+import os
+
+from PIL import Image, ImageDraw
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.classification_cache import ClassificationCache, dhash, hamming
+
+RESULTS = [{'label': "BARN OWL", 'score': 0.9}, {'label': "SNOWY OWL", 'score': 0.05}]
+
+
+def bird_image(shift=0, brightness=0):
+    image = Image.new('RGB', (120, 90), (40 + brightness, 90 + brightness, 40 + brightness))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((30 + shift, 20, 80 + shift, 70), fill=(200, 180, 150))
+    draw.rectangle((75 + shift, 35, 95 + shift, 45), fill=(240, 200, 40))
+    return image
+
+
+def test_near_duplicates_share_an_entry(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "cache.json"), "model-a")
+    cache.put(dhash(bird_image()), RESULTS)
+
+    # Slightly moved and brighter: same bird, same answer
+    assert hamming(dhash(bird_image()), dhash(bird_image(shift=1, brightness=10))) <= cache.threshold
+    assert cache.get(dhash(bird_image(shift=1, brightness=10))) == RESULTS
+    assert cache.get(dhash(bird_image().transpose(Image.FLIP_TOP_BOTTOM))) is None
+
+    # Persisted once flushed, but only for the same model
+    cache.flush()
+    assert ClassificationCache(cache.path, "model-a").get(dhash(bird_image())) == RESULTS
+    assert ClassificationCache(cache.path, "model-b").get(dhash(bird_image())) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "cache.json"), "model-a", max_entries=2, threshold=0)
+    cache.put(1, RESULTS)
+    cache.put(2, RESULTS)
+    assert cache.get(1) is not None  # 2 is now the oldest
+    cache.put(4, RESULTS)
+    cache.flush()
+
+    reloaded = ClassificationCache(cache.path, "model-a", max_entries=2, threshold=0)
+    assert reloaded.get(2) is None
+    assert reloaded.get(4) is not None
+    assert reloaded.get(1) is not None  # 4 is now the oldest
+    reloaded.flush()
+
+    # Recency from get() survives a restart
+    restarted = ClassificationCache(cache.path, "model-a", max_entries=2, threshold=0)
+    restarted.put(5, RESULTS)
+    assert restarted.get(4) is None
+    assert restarted.get(1) is not None
@@ -0,0 +1,42 @@
+import sys
+import os
+
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.label_policy import UNKNOWN_LABEL, LabelPolicy, sprite_family
+
+ID2LABEL = {0: "BLUE JAY", 1: "MOURNING DOVE", 2: "LOONEY BIRDS", 3: "HOUSE SPARROW", 4: "BARN OWL"}
+
+
+def test_priority_labels_win_and_blocked_labels_are_hidden():
+    policy = LabelPolicy(ID2LABEL)
+
+    ranked = np.array([
+        [0, 3, 4],  # sparrow is the first priority label
+        [0, 2, 1],  # dove, even below a blocked one
+        [2, 1, 0],  # blocked top result
+        [0, 2, 2],  # nothing prioritised: top result
+    ])
+    assert policy.choose(ranked) == [
+        ("HOUSE SPARROW", "sparrow"),
+        ("MOURNING DOVE", "pigeon"),
+        (UNKNOWN_LABEL, "owl"),
+        ("BLUE JAY", "owl"),
+    ]
+
+
+def test_scores_are_ranked_per_image():
+    policy = LabelPolicy(ID2LABEL)
+    scores = np.array([[0.15, 0.5, 0.0, 0.3, 0.05], [0.6, 0.0, 0.1, 0.02, 0.28]])
+    assert policy.rank(scores)[:, :3].tolist() == [[1, 3, 0], [0, 4, 2]]
+    assert policy.ids_for(["BARN OWL", "NOT A LABEL", "BLUE JAY"]).tolist() == [4, 0]
+
+
+def test_sprite_family_from_species_name():
+    assert sprite_family("Rock Pigeon") == "pigeon"
+    assert sprite_family("Eurasian Collared Dove") == "pigeon"
+    assert sprite_family("House Sparrow") == "sparrow"
+    assert sprite_family(None) == "owl"
@@ -0,0 +1,64 @@
+import sys
+import os
+from collections import OrderedDict
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai import model_registry
+
+
+class FakeModel:
+    def __init__(self, model_path):
+        self.model_path = model_path
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    for attr, value in [('_loaders', {}), ('_name_locks', {}), ('_models', OrderedDict()),
+                        ('_sizes', {}), ('_last_used', {})]:
+        monkeypatch.setattr(model_registry, attr, value)
+    monkeypatch.setattr(model_registry, '_start_reaper', lambda: None)
+
+    loads = []
+
+    def add(name, megabytes):
+        path = tmp_path / f"{name}.onnx"
+        path.write_bytes(b"\0" * (megabytes * 2**20))
+        model_registry.register(name, lambda: loads.append(name) or FakeModel(str(path)))
+
+    add('detector', 1)
+    add('classifier', 2)
+    add('sentiment', 3)
+    return loads
+
+
+def test_least_recently_used_models_make_room(registry, monkeypatch):
+    monkeypatch.setattr(model_registry, 'MEMORY_BUDGET_MB', 5)
+
+    detector = model_registry.get('detector')
+    model_registry.get('classifier')
+    assert model_registry.get('detector') is detector  # detector is now the most recent
+    assert model_registry.loaded_bytes() == 3 * 2**20
+
+    model_registry.get('sentiment')
+    assert model_registry.is_loaded('detector')
+    assert not model_registry.is_loaded('classifier')
+
+    # Reloaded transparently on the next use
+    model_registry.get('classifier')
+    assert registry == ['detector', 'classifier', 'sentiment', 'classifier']
+
+
+def test_idle_models_are_unloaded(registry, monkeypatch):
+    monkeypatch.setattr(model_registry, 'MEMORY_BUDGET_MB', None)
+    monkeypatch.setattr(model_registry, 'IDLE_EVICT_SECONDS', 60)
+
+    model_registry.get('detector')
+    model_registry.get('classifier')
+    model_registry._last_used['detector'] -= 120
+
+    assert model_registry.evict_idle() == ['detector']
+    assert model_registry.is_loaded('classifier')
@@ -0,0 +1,373 @@
+import sys
+import os
+import json
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data import storage
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    path = tmp_path / "saved_birds.json"
+    monkeypatch.setattr(storage, "DATA_FILE", str(path))
+    storage.close_repository()
+    yield path
+    storage.close_repository()
+
+
+def test_legacy_archive_is_migrated_once(data_file, monkeypatch):
+    from src.data import migrations
+
+    data_file.write_text(json.dumps([{"species": "Owl", "emotion_scores": {"joy": 1.0}}]))
+
+    birds = storage.load_birds()
+    assert len(birds) == 1
+    assert birds[0]['status'] == 'field'
+    assert birds[0]['id']
+    assert birds[0]['trait_scores'] == {}
+    assert birds[0]['backboard_thread_id'] is None
+    assert 'emotion_scores' not in birds[0]
+
+    on_disk = json.loads(data_file.read_text())
+    assert on_disk['schema_version'] == migrations.SCHEMA_VERSION
+
+    # Already current: no migration runs on the next load
+    calls = []
+    monkeypatch.setitem(migrations.MIGRATIONS, 1, calls.append)
+    storage.close_repository()
+    assert storage.load_birds() == birds
+    assert calls == []
+
+
+def test_status_index_follows_updates(data_file):
+    for species in ("Owl", "Rock Pigeon", "House Sparrow"):
+        assert storage.save_bird({'species': species})
+
+    owl_id = storage.load_birds()[0]['id']
+    storage.update_bird_status(owl_id, 'archived')
+
+    assert [b['species'] for b in storage.get_birds_by_status('archived')] == ["Owl"]
+    assert len(storage.get_birds_by_status('field')) == 2
+
+    storage.delete_bird(owl_id)
+    assert storage.get_birds_by_status('archived') == []
+    assert storage.get_bird(owl_id) is None
+
+
+def test_changes_survive_reload(data_file):
+    storage.save_bird({'species': "Owl"})
+    bird_id = storage.load_birds()[0]['id']
+    storage.update_bird_data(bird_id, {'name': "Hoots"})
+
+    storage.close_repository()
+    assert storage.get_bird(bird_id)['name'] == "Hoots"
+
+
+def test_returned_records_are_copies(data_file):
+    storage.save_bird({'species': "Owl"})
+    bird = storage.load_birds()[0]
+    bird['status'] = 'archived'
+
+    assert storage.get_birds_by_status('archived') == []
+
+
+def test_sqlite_backend_imports_json_once(data_file, tmp_path, monkeypatch):
+    data_file.write_text(json.dumps([
+        {"id": "a", "status": "archived", "species": "Owl", "trait_scores": {"Brave": 0.5}},
+        {"id": "b", "status": "field", "species": "Rock Pigeon", "backboard_thread_id": "t1"},
+    ]))
+    monkeypatch.setattr(storage, "STORAGE_BACKEND", "sqlite")
+    monkeypatch.setattr(storage, "SQLITE_FILE", str(tmp_path / "saved_birds.db"))
+    storage.close_repository()
+
+    archived = storage.get_birds_by_status('archived')
+    assert [b['id'] for b in archived] == ["a"]
+    assert archived[0]['trait_scores'] == {"Brave": 0.5}
+    assert storage.get_bird("b")['backboard_thread_id'] == "t1"
+
+    storage.update_bird_data("b", {'name': "Gus", 'trait_scores': {"Calm": 1.0}, 'status': 'archived'})
+    storage.delete_bird("a")
+
+    # Reopening must not re-import the JSON file
+    storage.close_repository()
+    assert [b['id'] for b in storage.get_birds_by_status('archived')] == ["b"]
+    bird = storage.get_bird("b")
+    assert bird['name'] == "Gus"
+    assert bird['trait_scores'] == {"Calm": 1.0}
+
+
+def test_sqlite_import_is_retried_until_it_completes(data_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_BACKEND", "sqlite")
+    monkeypatch.setattr(storage, "SQLITE_FILE", str(tmp_path / "saved_birds.db"))
+
+    # Unreadable JSON: the empty database must not count as imported
+    data_file.write_text('[{"species": "Ow')
+    storage.close_repository()
+    assert storage.count_birds() == 0
+
+    legacy = json.dumps([{"id": "a", "species": "Owl"}])
+    data_file.write_text(legacy)
+    storage.close_repository()
+    assert storage.get_bird("a")['status'] == 'field'
+    # Read without rewriting the user's file into the new schema
+    assert data_file.read_text() == legacy
+
+    storage.delete_bird("a")
+    storage.close_repository()
+    assert storage.count_birds() == 0
+
+
+def test_sqlite_records_always_carry_trait_scores(data_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_BACKEND", "sqlite")
+    monkeypatch.setattr(storage, "SQLITE_FILE", str(tmp_path / "saved_birds.db"))
+    storage.close_repository()
+
+    assert storage.save_bird({'species': "Owl"})
+    storage.close_repository()
+
+    bird = storage.load_birds()[0]
+    assert bird['trait_scores'] == {}
+    assert storage.get_bird(bird['id'])['trait_scores'] == {}
+
+
+def test_updates_are_journaled_and_compacted(data_file, monkeypatch):
+    from src.data import repository
+
+    storage.save_all_birds([{'species': "Owl"}])
+    bird_id = storage.load_birds()[0]['id']
+    snapshot = data_file.read_text()
+
+    storage.update_bird_data(bird_id, {'name': "Hoots"})
+    storage.flush()
+    assert data_file.read_text() == snapshot
+    journal = data_file.parent / "saved_birds.journal"
+    assert journal.exists()
+
+    # A torn trailing record (crash mid-append) is ignored on replay
+    with open(journal, 'a') as f:
+        f.write('{"op": "upd')
+    storage.close_repository()
+    assert storage.get_bird(bird_id)['name'] == "Hoots"
+    storage.update_bird_data(bird_id, {'personality': "Calm"})
+    storage.close_repository()
+    assert storage.get_bird(bird_id)['personality'] == "Calm"
+
+    monkeypatch.setattr(repository, "JOURNAL_COMPACT_BYTES", 1)
+    storage.update_bird_status(bird_id, 'archived')
+    storage.close_repository()
+
+    assert not journal.exists() or journal.stat().st_size == 0
+    assert json.loads(data_file.read_text())['birds'][0]['status'] == 'archived'
+    assert storage.get_birds_by_status('archived')[0]['name'] == "Hoots"
+
+
+def test_failed_compactions_keep_every_delta(data_file, monkeypatch):
+    from src.data import repository
+
+    storage.save_all_birds([{'species': "Owl"}])
+    bird_id = storage.load_birds()[0]['id']
+
+    def disk_full(path, data):
+        raise OSError("disk full")
+
+    rotated = data_file.parent / "saved_birds.journal.1"
+    with monkeypatch.context() as m:
+        m.setattr(repository, "JOURNAL_COMPACT_BYTES", 1)
+        m.setattr(repository, "atomic_write_json", disk_full)
+        for updates in ({'name': "Hoots"}, {'personality': "Calm"}):
+            storage.update_bird_data(bird_id, updates)
+            storage.flush()
+            storage.get_repository()._compaction.join()
+
+        # The second rotation must add to the first rotated journal, not replace it
+        assert len(rotated.read_text().splitlines()) == 2
+        storage.close_repository()
+
+    bird = storage.get_bird(bird_id)
+    assert (bird['name'], bird['personality']) == ("Hoots", "Calm")
+    assert not rotated.exists()
+
+
+def test_failed_journal_writes_are_retried(data_file, monkeypatch):
+    from src.data import journal
+
+    storage.save_all_birds([{'species': "Owl"}])
+    bird_id = storage.load_birds()[0]['id']
+
+    def disk_full(fd):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(journal.os, "fsync", disk_full)
+        storage.update_bird_data(bird_id, {'name': "Hoots"})
+        storage.flush()
+    # Still queued after the failure; written by the next flush
+    storage.flush()
+    assert '"Hoots"' in (data_file.parent / "saved_birds.journal").read_text()
+
+    storage.close_repository()
+    assert storage.get_bird(bird_id)['name'] == "Hoots"
+
+
+def test_deletes_are_saved_before_files_are_removed(data_file, tmp_path, monkeypatch):
+    from src.data import transcripts
+
+    monkeypatch.setattr(transcripts, "TRANSCRIPTS_DIR", str(tmp_path / "chats"))
+    storage.save_all_birds([{'species': "Owl"}])
+    bird_id = storage.load_birds()[0]['id']
+    transcripts.append_message(bird_id, "user", "hi")
+
+    storage.delete_bird(bird_id)
+    assert not os.path.exists(transcripts.transcript_path(bird_id))
+    # Already journaled, not waiting in the write-behind queue
+    journal = data_file.parent / "saved_birds.journal"
+    assert json.loads(journal.read_text().splitlines()[-1]) == {'op': 'delete', 'id': bird_id}
+
+
+def test_writes_are_coalesced_behind_the_main_thread(data_file):
+    storage.save_all_birds([{'species': "Owl"}])
+    bird_id = storage.load_birds()[0]['id']
+    journal = data_file.parent / "saved_birds.journal"
+
+    storage.update_bird_data(bird_id, {'name': "Hoots"})
+    storage.update_bird_status(bird_id, 'archived')
+    storage.update_bird_data(bird_id, {'personality': "Calm"})
+
+    # Served from memory straight away, written later
+    assert storage.get_bird(bird_id)['name'] == "Hoots"
+    assert not journal.exists()
+
+    storage.flush()
+    lines = journal.read_text().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])['set'] == {'name': "Hoots", 'status': 'archived', 'personality': "Calm"}
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_paged_queries(data_file, tmp_path, monkeypatch, backend):
+    monkeypatch.setattr(storage, "STORAGE_BACKEND", backend)
+    monkeypatch.setattr(storage, "SQLITE_FILE", str(tmp_path / "saved_birds.db"))
+    storage.close_repository()
+
+    storage.save_all_birds([
+        {'id': str(i), 'status': 'archived' if i % 2 else 'field', 'timestamp': f"2026-01-{i:02d}",
+         'name': f"Bird {20 - i:02d}" if i % 3 else None}
+        for i in range(1, 21)
+    ])
+
+    assert storage.count_birds() == 20
+    assert storage.count_birds('archived') == 10
+
+    page = [b['id'] for b in storage.iter_birds('archived', offset=2, limit=3, order_by='timestamp')]
+    assert page == ["5", "7", "9"]
+
+    newest = [b['id'] for b in storage.iter_birds('archived', limit=2, order_by='-timestamp')]
+    assert newest == ["19", "17"]
+
+    # Unnamed birds sort after named ones (before them in reverse), like missing timestamps
+    by_name = [b['id'] for b in storage.iter_birds('archived', order_by='name')]
+    assert by_name == ["19", "17", "13", "11", "7", "5", "1", "3", "9", "15"]
+    assert [b['id'] for b in storage.iter_birds('archived', limit=2, order_by='-name')] == ["3", "9"]
+
+    storage.update_bird_status("19", 'field')
+    assert [b['id'] for b in storage.iter_birds('archived', limit=1, order_by='-timestamp')] == ["17"]
+    assert len(list(storage.iter_birds())) == 20
+
+    with pytest.raises(ValueError):
+        list(storage.iter_birds(order_by='data'))
+
+
+def test_captures_are_deduplicated_and_collected(data_file, tmp_path, monkeypatch):
+    import numpy as np
+    from src.data import capture_store
+
+    monkeypatch.setattr(capture_store, "OBJECTS_DIR", str(tmp_path / "objects"))
+    pixels = np.full((8, 8, 3), (200, 100, 50), dtype=np.uint8)
+
+    first = capture_store.store_array(pixels)
+    second = capture_store.store_array(pixels.copy())
+    assert first == second
+    capture_store.ensure_written(first)
+    assert first.endswith(".png") and os.path.exists(first)
+
+    storage.save_bird({'species': "Owl", 'image_path': first})
+    storage.save_bird({'species': "Owl", 'image_path': second})
+    ids = [b['id'] for b in storage.load_birds()]
+
+    storage.delete_bird(ids[0])
+    assert os.path.exists(first)
+    storage.delete_bird(ids[1])
+    assert not os.path.exists(first)
+    assert capture_store.collect_garbage() == 0
+
+
+def test_arrays_are_stored_in_the_background(tmp_path, monkeypatch):
+    import numpy as np
+    from PIL import Image
+    from src.data import capture_store
+
+    monkeypatch.setattr(capture_store, "OBJECTS_DIR", str(tmp_path / "objects"))
+    pixels = np.zeros((6, 10, 3), dtype=np.uint8)
+    pixels[2:4, 3:7] = (10, 200, 30)
+
+    path = capture_store.store_array(pixels)
+    capture_store.ensure_written(path)
+    with Image.open(path) as image:
+        assert np.array_equal(np.asarray(image.convert('RGB')), pixels)
+
+    capture_store.release(path)
+    assert not os.path.exists(path)
+
+
+def test_thumbnails_are_regenerated_when_the_source_changes(data_file, tmp_path):
+    from PIL import Image
+    from src.data import thumbnails
+
+    source = tmp_path / "capture.png"
+    Image.new('RGB', (640, 480), (255, 0, 0)).save(source)
+    storage.save_bird({'species': "Owl", 'image_path': str(source)})
+    bird_id = storage.load_birds()[0]['id']
+
+    thumb = thumbnails.get_thumbnail(bird_id, (140, 140))
+    assert thumb.get_size() == (140, 140)
+    red, _green, blue = thumb.get_at((70, 70))[:3]
+    assert red > 200 and blue < 50
+    variant = tmp_path / "capture.thumb160.bmp"
+    assert variant.exists()
+
+    Image.new('RGB', (640, 480), (0, 0, 255)).save(source)
+    os.utime(source, (variant.stat().st_mtime + 10,) * 2)
+    red, _green, blue = thumbnails.get_thumbnail(bird_id, (140, 140)).get_at((70, 70))[:3]
+    assert red < 50 and blue > 200
+
+
+def test_chat_transcripts_page_backwards(tmp_path, monkeypatch):
+    from src.data import transcripts
+
+    monkeypatch.setattr(transcripts, "TRANSCRIPTS_DIR", str(tmp_path / "chats"))
+    monkeypatch.setattr(transcripts, "READ_BLOCK", 16)
+
+    for i in range(25):
+        transcripts.append_message("owl", "user" if i % 2 else "bird", f"message {i}")
+
+    recent, offset = transcripts.read_messages("owl", count=10)
+    assert [text for _sender, text in recent] == [f"message {i}" for i in range(15, 25)]
+
+    older, offset = transcripts.read_messages("owl", count=10, before=offset)
+    assert [text for _sender, text in older] == [f"message {i}" for i in range(5, 15)]
+    oldest, offset = transcripts.read_messages("owl", count=10, before=offset)
+    assert [text for _sender, text in oldest] == [f"message {i}" for i in range(5)]
+    assert offset == 0
+
+    # A torn last line is skipped and doesn't swallow the next message
+    with open(transcripts.transcript_path("owl"), "ab") as f:
+        f.write(b'["bird","tor')
+    transcripts.append_message("owl", "user", "after crash")
+    recent, _offset = transcripts.read_messages("owl", count=3)
+    assert recent[-2:] == [("bird", "message 24"), ("user", "after crash")]
+
+    assert transcripts.read_messages("nobody") == ([], 0)
@@ -0,0 +1,53 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai import trait_lexicon
+
+TRAITS = ['Intelligent', 'Curious', 'Brave', 'Lazy', 'Friendly', 'Calm', 'Annoying']
+
+
+def test_confident_short_lines_are_answered():
+    scores, confidence = trait_lexicon.score("hiii you're so cute", TRAITS)
+    assert max(scores, key=scores.get) == 'Friendly'
+    assert abs(sum(scores.values()) - 1.0) < 1e-9
+    assert confidence >= trait_lexicon.CONFIDENCE_THRESHOLD
+
+    scores, _confidence = trait_lexicon.score("shut up", TRAITS)
+    assert max(scores, key=scores.get) == 'Annoying'
+
+
+def test_ambiguous_or_long_text_falls_through():
+    # No keywords
+    assert trait_lexicon.score("the pond", TRAITS) == (None, 0.0)
+    # A tie between two traits
+    scores, confidence = trait_lexicon.score("hello, why?", TRAITS)
+    assert scores is None and 0 < confidence < trait_lexicon.CONFIDENCE_THRESHOLD
+    # Too long for keywords to be trusted
+    long_text = "hello " + "and then we walked along the river for a while " * 3
+    assert trait_lexicon.score(long_text, TRAITS) == (None, 0.0)
+
+
+def test_only_candidate_labels_are_scored():
+    scores, _confidence = trait_lexicon.score("you're so smart", ['Intelligent', 'Lazy'])
+    assert set(scores) == {'Intelligent', 'Lazy'}
+    assert trait_lexicon.score("you're so smart", ['Lazy', 'Calm']) == (None, 0.0)
+
+
+def test_negated_lines_go_to_the_model():
+    for text in ("I don't hate you", "you are not stupid", "you're not cute", "never calm", "dont be dumb"):
+        scores, confidence = trait_lexicon.score(text, TRAITS)
+        assert scores is None and confidence > 0
+
+
+def test_confidence_depends_on_hits_and_length():
+    _scores, one_hit = trait_lexicon.score("you're cute", TRAITS)
+    _scores, two_hits = trait_lexicon.score("cute sweet bird", TRAITS)
+    _scores, diluted = trait_lexicon.score("I think the weather is nice today and you are cute", TRAITS)
+    assert diluted < one_hit < two_hits
+
+    # A weak hit in a longer line is left to the model, unlike the same hit alone
+    assert diluted < trait_lexicon.CONFIDENCE_THRESHOLD <= one_hit
+    assert trait_lexicon.score("I think the weather is nice today and you are cute", TRAITS)[0] is None